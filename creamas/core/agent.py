@@ -6,8 +6,10 @@ Agent module holds :class:`CreativeAgent` implementation, a subclass of
 :class:`aiomas.Agent`, which holds basic functionality thought to be shared by
 creative agents.
 """
+import asyncio
+import heapq
 import logging
-from random import choice
+from random import choices
 
 from aiomas import Agent
 
@@ -53,11 +55,13 @@ class CreativeAgent(Agent):
         self._A = []
         self._D = {}
         self._connections = {}
+        self._proxies = {}
 
         if type(name) is str and len(name) > 0:
             self.__name = name
         else:
             self.__name = self.addr
+        self._repr = "{}({})".format(self.__class__.__name__, self.__name)
 
         if type(log_folder) is str:
             self._logger = ObjectLogger(self, log_folder, add_name=True,
@@ -76,6 +80,7 @@ class CreativeAgent(Agent):
     @name.setter
     def name(self, name):
         self.__name = name
+        self._repr = "{}({})".format(self.__class__.__name__, name)
 
     @property
     def logger(self):
@@ -171,7 +176,7 @@ class CreativeAgent(Agent):
             If the artifact is not derived from
             :class:`~creamas.core.artifact.Artifact`.
         """
-        if not issubclass(artifact.__class__, Artifact):
+        if not isinstance(artifact, Artifact):
             raise TypeError("Artifact to add ({}) is not {}."
                             .format(artifact, Artifact))
         self._A.append(artifact)
@@ -191,9 +196,7 @@ class CreativeAgent(Agent):
             ``True`` if the agent was successfully added, ``False`` otherwise.
         """
         if addr not in self._connections:
-            self.connections[addr] = {}
-            for k, v in kwargs.items():
-                self.connections[addr][k] = v
+            self._connections[addr] = kwargs
             return True
         return False
 
@@ -206,16 +209,13 @@ class CreativeAgent(Agent):
             A boolean list, as returned by
             :meth:`~creamas.core.agent.CreativeAgent.add_connections`.
         """
-        rets = []
-        for addr, kwargs in conns:
-            r = self.add_connection(addr, **kwargs)
-            rets.append(r)
-        return rets
+        return [self.add_connection(addr, **kwargs) for addr, kwargs in conns]
 
     @expose
     def remove_connection(self, addr):
         """Remove agent with given address from current connections.
         """
+        self._proxies.pop(addr, None)
         return self._connections.pop(addr, None)
 
     @expose
@@ -223,6 +223,7 @@ class CreativeAgent(Agent):
         """Clear all connections from the agent.
         """
         self._connections = {}
+        self._proxies = {}
 
     @expose
     def get_connections(self, data=False):
@@ -235,7 +236,22 @@ class CreativeAgent(Agent):
         """
         if data:
             return self._connections
-        return list(self._connections.keys())
+        return list(self._connections)
+
+    def best_connections(self, k=1, key='attitude'):
+        """Get the addresses of the connections with the highest values for
+        a key in their data dictionaries.
+
+        Connections which do not have the key in their data are ignored.
+
+        :param int k: The maximum number of addresses to return.
+        :param str key: The key in the connection data to rank the connections by.
+        :returns:
+            A list of at most *k* addresses in the descending order of their
+            values for *key*.
+        """
+        conns = [(data[key], addr) for addr, data in self._connections.items() if key in data]
+        return [addr for _, addr in heapq.nlargest(k, conns, key=lambda x: x[0])]
 
     async def connect(self, addr):
         """Connect to agent in given address using the agent's environment.
@@ -252,8 +268,20 @@ class CreativeAgent(Agent):
 
         :returns: :class:`aiomas.Proxy` object for the connected agent.
         """
-        addr = choice(list(self._connections.keys()))
-        return await self.env.connect(addr)
+        return (await self.random_connections(1))[0]
+
+    async def random_connections(self, k=1):
+        """Connect to *k* random agents from current :attr:`connections`.
+
+        The agents are sampled with replacement in a single call to
+        :func:`random.choices`.
+
+        :param int k: The number of agents to connect to.
+        :returns:
+            A list of :class:`aiomas.Proxy` objects for the connected agents.
+        """
+        addrs = choices(list(self._connections), k=k)
+        return await asyncio.gather(*[self._get_proxy(addr) for addr in addrs])
 
     def publish(self, artifact):
         """Publish artifact to agent's environment.
@@ -262,7 +290,7 @@ class CreativeAgent(Agent):
         :type artifact: :py:class:`~creamas.core.artifact.Artifact`
         """
         self.env.add_artifact(artifact)
-        self._log(logging.DEBUG, "Published {} to domain.".format(artifact))
+        self._log(logging.DEBUG, "Published %s to domain.", artifact)
 
     def refill(self):
         """Refill agent's resources to maximum."""
@@ -290,12 +318,65 @@ class CreativeAgent(Agent):
             remote_agent = await self.env.connect(addr)
             opinion = await remote_agent.evaluate(artifact)
 
+        If the agent in *addr* lives in the same environment, its
+        :meth:`evaluate` is called directly with the artifact object instead
+        of going through the RPC machinery.
+
         .. note::
 
             The artifact object should be serializable by the environment.
         """
-        remote_agent = await self.env.connect(addr)
-        return await remote_agent.evaluate(artifact)
+        local_agent = self._get_local_agent(addr)
+        if local_agent is not None:
+            ret = local_agent.evaluate(artifact)
+            if asyncio.iscoroutine(ret):
+                ret = await ret
+            return ret
+
+        remote_agent = await self._get_proxy(addr)
+        try:
+            return await remote_agent.evaluate(artifact)
+        except ConnectionError:
+            # The cached proxy may have gone stale, reconnect once.
+            self._proxies.pop(addr, None)
+            remote_agent = await self._get_proxy(addr)
+            return await remote_agent.evaluate(artifact)
+
+    async def ask_opinions(self, addrs, artifact):
+        """Ask several agents' opinions about an artifact concurrently.
+
+        :param list addrs: Addresses of the agents which opinions are asked
+        :param object artifact: artifact to be evaluated
+        :returns: A list of the agents' evaluations in the order of *addrs*.
+
+        .. seealso::
+
+            :meth:`~creamas.core.agent.CreativeAgent.ask_opinion`
+        """
+        return await asyncio.gather(*[self.ask_opinion(addr, artifact)
+                                      for addr in addrs])
+
+    def _get_local_agent(self, addr):
+        """Get the agent in *addr* if it lives in the same environment as this
+        agent, otherwise return ``None``.
+        """
+        try:
+            return self.env.get_agent(addr)
+        except (ValueError, KeyError):
+            return None
+
+    async def _get_proxy(self, addr):
+        """Get a proxy to the agent in *addr*, connecting to it only if no
+        proxy has been cached for the address.
+
+        The cached proxies are dropped when the connection is removed or the
+        agent is closed.
+        """
+        proxy = self._proxies.get(addr)
+        if proxy is None:
+            proxy = await self.env.connect(addr)
+            self._proxies[addr] = proxy
+        return proxy
 
     @expose
     async def act(self, *args, **kwargs):
@@ -312,9 +393,9 @@ class CreativeAgent(Agent):
         """
         return args, kwargs
 
-    def _log(self, level, msg):
+    def _log(self, level, msg, *args):
         if self.logger is not None:
-            self.logger.log(level, msg)
+            self.logger.log(level, msg, *args)
 
     @expose
     def close(self, folder=None):
@@ -324,10 +405,10 @@ class CreativeAgent(Agent):
 
         :param str folder: Folder where the agent should save its data.
         """
-        pass
+        self._proxies = {}
 
     def __str__(self):
         return self.__repr__()
 
     def __repr__(self):
-        return "{}({})".format(self.__class__.__name__, self.name)
+        return self._repr
@@ -14,7 +14,7 @@ adding agents to their container.
 import asyncio
 
 import logging
-from random import choice, shuffle
+from random import choice, sample
 
 from aiomas import Container
 
@@ -48,6 +48,7 @@ class Environment(Container):
         self._logger = None
         self._log_folder = None
         self._artifacts = []
+        self._artifacts_by_creator = {}
         self._candidates = []
         self._name = base_url
 
@@ -56,7 +57,7 @@ class Environment(Container):
         try:
             import setproctitle as spt
             spt.setproctitle('Creamas: {}'.format(str(self)))
-        except:
+        except ImportError:
             pass
 
     @property
@@ -119,7 +120,7 @@ class Environment(Container):
         agents = list(self.agents.dict.values())
         if hasattr(self, 'manager') and self.manager is not None:
             if not include_manager:
-                agents = [a for a in agents if a.addr.rsplit('/', 1)[1] != '0']
+                agents = [a for a in agents if not a.addr.endswith('/0')]
         if agent_cls is not None:
             agents = [a for a in agents if type(a) is agent_cls]
         if addr:
@@ -132,12 +133,12 @@ class Environment(Container):
         :raises ValueError: If given address is not part of this environment
         :raises KeyError: If no such agent in the environment
         """
-        base_url, agent_number = addr.rsplit('/', 1)
-        base_url += "/"
+        i = addr.rfind('/') + 1
+        base_url = addr[:i]
         if base_url != self._base_url:
             raise ValueError("Given address' base URL ({}) does not match with the environment ({})."
                              .format(base_url, self._base_url))
-        agent = self.agents.dict[agent_number]
+        agent = self.agents.dict[addr[i:]]
         return agent
 
     async def trigger_act(self, *args, addr=None, agent=None, **kwargs):
@@ -151,7 +152,7 @@ class Environment(Container):
             raise TypeError("Either addr or agent has to be defined.")
         if agent is None:
             agent = self.get_agent(addr)
-        self._log(logging.DEBUG, "Triggering agent in {}".format(agent.addr))
+        self._log(logging.DEBUG, "Triggering agent in %s", agent.addr)
         ret = await agent.act(*args, **kwargs)
         return ret
 
@@ -166,11 +167,8 @@ class Environment(Container):
         .. note::
             The environment's manager agent, i.e. if the environment has :attr:`manager`, is excluded from acting.
         """
-        tasks = []
-        for a in self.get_agents(addr=False, include_manager=False):
-            task = asyncio.ensure_future(self.trigger_act
-                                         (*args, agent=a, **kwargs))
-            tasks.append(task)
+        tasks = [self.trigger_act(*args, agent=a, **kwargs) for a in
+                 self.get_agents(addr=False, include_manager=False)]
         rets = await asyncio.gather(*tasks)
         return rets
 
@@ -207,12 +205,13 @@ class Environment(Container):
             raise TypeError("Argument 'n' must be of type int.")
         if n <= 0:
             raise ValueError("Argument 'n' must be greater than zero.")
-        for a in self.get_agents(addr=False):
-            others = self.get_agents(addr=False)[:]
-            others.remove(a)
-            shuffle(others)
-            for r_agent in others[:n]:
-                a.add_connection(r_agent)
+        agents = self.get_agents(addr=False)
+        k = min(n + 1, len(agents))
+        for a in agents:
+            # Sample one extra agent in case the agent itself is sampled.
+            others = [r for r in sample(agents, k) if r is not a][:n]
+            for r_agent in others:
+                a.add_connection(r_agent.addr)
 
     def create_connections(self, connection_map):
         """Create agent connections from a given connection map.
@@ -278,16 +277,31 @@ class Environment(Container):
         """
         artifact.env_time = self.age
         self.artifacts.append(artifact)
-        self._log(logging.DEBUG, "ARTIFACTS appended: '{}', length={}"
-                  .format(artifact, len(self.artifacts)))
+        self._artifacts_by_creator.setdefault(artifact.creator, []).append(artifact)
+        self._log(logging.DEBUG, "ARTIFACTS appended: '%s', length=%d",
+                  artifact, len(self.artifacts))
 
     def add_artifacts(self, artifacts):
         """Add artifacts to :attr:`artifacts`.
 
         :param artifacts: list of :py:class:`~creamas.core.artifact.Artifact` objects
+
+        If a subclass overrides :meth:`add_artifact`, it is called for each artifact. Otherwise the artifacts are
+        added in one go.
         """
+        if type(self).add_artifact is not Environment.add_artifact:
+            for artifact in artifacts:
+                self.add_artifact(artifact)
+            return
+        artifacts = list(artifacts)
+        age = self.age
+        by_creator = self._artifacts_by_creator
         for artifact in artifacts:
-            self.add_artifact(artifact)
+            artifact.env_time = age
+            by_creator.setdefault(artifact.creator, []).append(artifact)
+        self.artifacts.extend(artifacts)
+        self._log(logging.DEBUG, "ARTIFACTS extended with %d artifacts, length=%d",
+                  len(artifacts), len(self.artifacts))
 
     async def get_artifacts(self, agent=None):
         """Return artifacts published to the environment.
@@ -299,19 +313,23 @@ class Environment(Container):
 
         If environment has a :attr:`manager` agent, e.g. it is a slave environment in
         :class:`~creamas.mp.MultiEnvironment`, then the manager's :meth:`~creamas.mp.EnvManager.get_artifacts` is called.
+        Otherwise, the artifacts of the agent are looked up from an index which :meth:`add_artifact` keeps by the
+        artifacts' creators.
         """
         # TODO: Figure better way for this
         if hasattr(self, 'manager') and self.manager is not None:
             artifacts = await self.manager.get_artifacts()
+        elif agent is not None:
+            return list(self._artifacts_by_creator.get(agent.name, ()))
         else:
             artifacts = self.artifacts
         if agent is not None:
             artifacts = [a for a in artifacts if agent.name == a.creator]
         return artifacts
 
-    def _log(self, level, msg):
+    def _log(self, level, msg, *args):
         if self.logger is not None:
-            self.logger.log(level, msg)
+            self.logger.log(level, msg, *args)
 
     def save_info(self, folder, *args, **kwargs):
         """Save information accumulated during the environments lifetime.
@@ -152,7 +152,7 @@ class GPImageArtifact(Artifact):
                 if type(val) is not int:
                     val = np.around(val)
                 img[x, y] = val
-        except:
+        except Exception:
             # Return black image if any errors occur.
             import traceback
             print(traceback.format_exc())
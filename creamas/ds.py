@@ -14,6 +14,7 @@ on computing clusters or other distributed systems.
 import asyncio
 import logging
 import multiprocessing
+import sys
 
 import asyncssh
 
@@ -229,11 +230,12 @@ class DistributedEnvironment(MultiEnvironment):
         """
         pool = multiprocessing.Pool(len(self.nodes))
         rets = []
+        mgr_addrs = []
         for i, node in enumerate(self.nodes):
             server, server_port = node
             port = ports[node] if ports is not None else self.port
-            mgr_addr = "tcp://{}:{}/0".format(server, port)
-            self._manager_addrs.append(mgr_addr)
+            mgr_addr = sys.intern("tcp://{}:{}/0".format(server, port))
+            mgr_addrs.append(mgr_addr)
             if type(spawn_cmd) in [list, tuple]:
                 cmd = spawn_cmd[i]
             else:
@@ -246,6 +248,7 @@ class DistributedEnvironment(MultiEnvironment):
                                    kwds=ssh_kwargs_cp,
                                    error_callback=logger.warning)
             rets.append(ret)
+        self._manager_addrs = tuple(mgr_addrs)
         self._pool = pool
         self._r = rets
 
@@ -272,7 +275,7 @@ class DistributedEnvironment(MultiEnvironment):
         returns 8 addresses.
         """
         async def slave_task(addr):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.get_slave_managers()
 
         tasks = create_tasks(slave_task, self.addrs)
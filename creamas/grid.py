@@ -93,7 +93,7 @@ class GridAgent(CreativeAgent):
         try:
             r_agent = await self.env.connect(addr, timeout=10)
             return await r_agent.rcv(msg)
-        except:
+        except Exception:
             self._log(logging.WARNING, "Could not connect to agent in {}:\n{}"
                       .format(addr, traceback.format_exc()))
         return None
@@ -413,19 +413,19 @@ class GridMultiEnvironment(MultiEnvironment):
         return self._gs
 
     async def set_gs(self, addr, gs):
-        r_agent = await self.env.connect(addr)
+        r_agent = await self._get_proxy(addr)
         return await r_agent.set_gs(gs)
 
     async def get_gs(self, addr):
-        r_agent = await self.env.connect(addr)
+        r_agent = await self._get_proxy(addr)
         return await r_agent.get_gs()
 
     async def set_origin(self, addr, origin):
-        r_agent = await self.env.connect(addr)
+        r_agent = await self._get_proxy(addr)
         return await r_agent.set_origin(origin)
 
     async def get_origin(self, addr):
-        r_agent = await self.env.connect(addr)
+        r_agent = await self._get_proxy(addr)
         return await r_agent.get_origin()
 
     @property
@@ -457,7 +457,7 @@ class GridMultiEnvironment(MultiEnvironment):
         if manager_addr is None:
             return None
         else:
-            r_agent = await self._env.connect(manager_addr)
+            r_agent = await self._get_proxy(manager_addr)
             xy_addr = await r_agent.get_xy_address(xy)
             return xy_addr
 
@@ -467,19 +467,19 @@ class GridMultiEnvironment(MultiEnvironment):
         """
         for i, elem in enumerate(self._slave_origins):
             o, addr = elem
-            r_slave = await self.env.connect(addr)
+            r_slave = await self._get_proxy(addr)
             nxy = _get_neighbor_xy('N', o)
             exy = _get_neighbor_xy('E', (o[0] + self.gs[0] - 1, o[1]))
             sxy = _get_neighbor_xy('S', (o[0], o[1] + self.gs[1] - 1))
             wxy = _get_neighbor_xy('W', o)
             if i == 0 and self.neighbors['W'] is not None:
                 m_addr = self.neighbors['W']
-                r_manager = await self.env.connect(m_addr)
+                r_manager = await self._get_proxy(m_addr)
                 n_addr = await r_manager.get_xy_environment(wxy)
                 await r_slave.set_grid_neighbor('W', n_addr)
             elif i == self._n_slaves - 1 and self.neighbors['E'] is not None:
                 m_addr = self.neighbors['E']
-                r_manager = await self.env.connect(m_addr)
+                r_manager = await self._get_proxy(m_addr)
                 n_addr = await r_manager.get_xy_environment(exy)
                 await r_slave.set_grid_neighbor('E', n_addr)
             else:
@@ -490,13 +490,13 @@ class GridMultiEnvironment(MultiEnvironment):
 
             if self.neighbors['N'] is not None:
                 m_addr = self.neighbors['N']
-                r_manager = await self.env.connect(m_addr)
+                r_manager = await self._get_proxy(m_addr)
                 n_addr = await r_manager.get_xy_environment(nxy)
                 await r_slave.set_grid_neighbor('N', n_addr)
 
             if self.neighbors['S'] is not None:
                 m_addr = self.neighbors['S']
-                r_manager = await self.env.connect(m_addr)
+                r_manager = await self._get_proxy(m_addr)
                 n_addr = await r_manager.get_xy_environment(sxy)
                 await r_slave.set_grid_neighbor('S', n_addr)
 
@@ -505,7 +505,7 @@ class GridMultiEnvironment(MultiEnvironment):
         Assumes that all the slave environments have their neighbors set.
         """
         for addr in self.addrs:
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             await r_manager.set_agent_neighbors()
 
     async def set_neighbors(self):
@@ -519,7 +519,7 @@ class GridMultiEnvironment(MultiEnvironment):
         await self.set_agent_neighbors()
 
     async def _populate_slave(self, addr, agent_cls, n, *args, **kwargs):
-        r_manager = await self.env.connect(addr, timeout=5)
+        r_manager = await self._get_proxy(addr, timeout=5)
         ret = await r_manager.spawn_n(agent_cls, n, *args, **kwargs)
         return ret
 
@@ -529,13 +529,10 @@ class GridMultiEnvironment(MultiEnvironment):
         excludes the slave environment managers as they are not in the grids.)
         """
         n = self.gs[0] * self.gs[1]
-        tasks = []
-        for addr in self.addrs:
-            task = asyncio.ensure_future(self._populate_slave(addr, agent_cls,
-                                                              n, *args,
-                                                              **kwargs))
-            tasks.append(task)
+        tasks = [self._populate_slave(addr, agent_cls, n, *args, **kwargs)
+                 for addr in self.addrs]
         rets = await asyncio.gather(*tasks)
+        self.invalidate_agents_cache()
         return rets
 
 
@@ -126,7 +126,16 @@ class ObjectLogger():
         msg = self.write(attr_name)
         self.log(level, msg)
 
-    def log(self, level, msg):
+    def log(self, level, msg, *args):
+        '''Log message prefixed with the object's name.
+
+        If *args* are given, the message is formatted with ``msg % args``
+        only when the logger is enabled for *level*.
+        '''
+        if not self.logger.isEnabledFor(level):
+            return
+        if args:
+            msg = msg % args
         self.logger.log(level, "{}: {}".format(self.obj.name, msg))
         sys.stdout.flush()
 
@@ -16,13 +16,16 @@ environment. See :class:`~creamas.mp.EnvManager` and :class:`~creamas.mp.MultiEn
 import asyncio
 import logging
 import multiprocessing
+import os
+import sys
 import time
 
 from aiomas.subproc import Manager
 from aiomas.agent import _get_base_url
+from aiomas.util import obj_from_str
 
 from creamas.core.environment import Environment
-from creamas.util import run_or_coro, create_tasks, expose
+from creamas.util import run_or_coro, create_tasks, expose, get_manager
 
 
 logger = logging.getLogger(__name__)
@@ -53,6 +56,7 @@ class EnvManager(Manager):
     def __init__(self, environment):
         super().__init__(environment)
         self._host_manager = None
+        self._host_proxy = None
 
     @property
     def env(self):
@@ -66,6 +70,7 @@ class EnvManager(Manager):
             Address for the host manager.
         """
         self._host_manager = addr
+        self._host_proxy = None
 
     @expose
     def host_manager(self):
@@ -78,12 +83,20 @@ class EnvManager(Manager):
         """Report message to the host manager.
         """
         try:
-            host_manager = await self.env.connect(self.host_manager, timeout=timeout)
-        except:
-            raise ConnectionError("Could not reach host manager ({}).".format(self.host_manager))
+            host_manager = await self._get_host_proxy(timeout=timeout)
+        except Exception:
+            raise ConnectionError("Could not reach host manager ({}).".format(self._host_manager))
         ret = await host_manager.handle(msg)
         return ret
 
+    async def _get_host_proxy(self, timeout=TIMEOUT):
+        """Get a proxy to the host manager, connecting to it only if no proxy
+        has been cached since the host manager was set.
+        """
+        if self._host_proxy is None:
+            self._host_proxy = await self.env.connect(self._host_manager, timeout=timeout)
+        return self._host_proxy
+
     @expose
     def handle(self, msg):
         """Handle message, override in subclass if needed.
@@ -99,6 +112,14 @@ class EnvManager(Manager):
         """
         return self.env.get_agents(addr=addr, agent_cls=agent_cls)
 
+    @expose
+    def get_agent_count(self):
+        """Get the number of agents in the managed environment, excluding the
+        manager.
+        """
+        # The agents' dictionary includes this manager.
+        return len(self.env.agents.dict) - 1
+
     @expose
     def set_log_folder(self, log_folder):
         self.env.log_folder = log_folder
@@ -131,7 +152,7 @@ class EnvManager(Manager):
 
         :returns: All the artifacts in the environment.
         """
-        host_manager = await self.env.connect(self._host_manager, timeout=TIMEOUT)
+        host_manager = await self._get_host_proxy()
         artifacts = await host_manager.get_artifacts()
         return artifacts
 
@@ -141,6 +162,14 @@ class EnvManager(Manager):
         """
         pass
 
+    @expose
+    async def trigger_act(self, addr, *args, **kwargs):
+        """Trigger the agent in *addr* in the managed environment to act.
+
+        This is a managing function for :meth:`~creamas.core.environment.Environment.trigger_act`.
+        """
+        return await self.env.trigger_act(*args, addr=addr, **kwargs)
+
     @expose
     async def trigger_all(self, *args, **kwargs):
         """Trigger all agents in the managed environment to act once.
@@ -166,10 +195,45 @@ class EnvManager(Manager):
 
         See :meth:`~aiomas.subproc.Manager.spawn` for details.
         """
+        return await self._spawn_batch([(agent_cls, args, kwargs)] * n)
+
+    @expose
+    async def spawn_many(self, specs):
+        """Spawn agents with differing initialization parameters to the
+        managed environment.
+
+        :param list specs:
+            A list of ``(agent_cls, args, kwargs)``-tuples, one for each agent
+            to be spawned.
+
+        :returns:
+            A list of (:class:`aiomas.rpc.Proxy`, address)-tuples for the
+            spawned agents in the order of *specs*.
+        """
+        return await self._spawn_batch(specs)
+
+    async def _spawn_batch(self, specs):
+        """Create agents for a list of ``(agent_cls, args, kwargs)``-tuples in
+        the managed environment.
+
+        Does the same as :meth:`~aiomas.subproc.Manager.spawn` for each tuple,
+        but each agent class is looked up only once per batch. The base
+        implementation resolves the class from its ``qualname`` on every call,
+        so it is not called here.
+        """
+        env = self.env
+        callables = {}
         rets = []
-        for _ in range(n):
-            ret = await self.spawn(agent_cls, *args, **kwargs)
-            rets.append(ret)
+        for agent_cls, args, kwargs in specs:
+            if agent_cls not in callables:
+                callables[agent_cls] = obj_from_str(agent_cls)
+            factory = callables[agent_cls]
+            if asyncio.iscoroutinefunction(factory):
+                agent = await factory(env, *args, **kwargs)
+            else:
+                agent = factory(env, *args, **kwargs)
+            logger.debug('Spawned %s(%s)', agent.__class__.__name__, agent)
+            rets.append((agent, agent.addr))
         return rets
 
 
@@ -236,6 +300,39 @@ class MultiEnvManager(Manager):
         ret = await self.menv.spawn_n(agent_cls, n, *args, addr=addr, **kwargs)
         return [r[1] for r in ret]
 
+    @expose
+    async def spawn_many(self, specs, addr=None):
+        """Spawn agents with differing initialization parameters.
+
+        This is a managing function for
+        :meth:`~creamas.mp.MultiEnvironment.spawn_many`.
+
+        .. note::
+
+            Since :class:`aiomas.rpc.Proxy` objects do not seem to handle
+            (re)serialization, only the addresses of the spawned agents are
+            returned.
+        """
+        ret = await self.menv.spawn_many(specs, addr=addr)
+        return [r[1] for r in ret]
+
+    @expose
+    async def spawn_n_all(self, agent_cls, n, *args, **kwargs):
+        """Spawn :attr:`n` agents with same initialization parameters to each
+        slave environment.
+
+        This is a managing function for
+        :meth:`~creamas.mp.MultiEnvironment.spawn_n_all`.
+
+        .. note::
+
+            Since :class:`aiomas.rpc.Proxy` objects do not seem to handle
+            (re)serialization, only the addresses of the spawned agents are
+            returned.
+        """
+        ret = await self.menv.spawn_n_all(agent_cls, n, *args, **kwargs)
+        return [r[1] for r in ret]
+
     @expose
     async def get_agents(self, addr=True, agent_cls=None):
         """Get addresses of all agents in all the slave environments.
@@ -369,6 +466,11 @@ class MultiEnvironment():
         # Destroy the environment to free the resources
         menv.destroy(as_coro=False)
     """
+    __slots__ = ('_addr', '_env', '_manager', '_age', '_artifacts',
+                 '_candidates', '_manager_addrs', '_proxies', '_name',
+                 '_logger', '_pool', '_r', '_slave_procs', '_agent_counts',
+                 '_agents_cache', '_socket_paths', '_artifacts_by_creator')
+
     def __init__(self, addr, env_cls, mgr_cls=None, name=None,
                  logger=None, **env_kwargs):
         """
@@ -399,8 +501,10 @@ class MultiEnvironment():
 
         self._age = 0
         self._artifacts = []
+        self._artifacts_by_creator = {}
         self._candidates = []
-        self._manager_addrs = []
+        self._manager_addrs = ()
+        self._proxies = {}
 
         if type(name) is str:
             self._name = name
@@ -410,6 +514,10 @@ class MultiEnvironment():
         self._logger = logger
         self._pool = None
         self._r = None
+        self._slave_procs = {}
+        self._agent_counts = None
+        self._agents_cache = {}
+        self._socket_paths = []
 
     def __str__(self):
         return self.__repr__()
@@ -455,23 +563,44 @@ class MultiEnvironment():
         default. Essentially, this method calls each slave environment
         manager's :meth:`~creamas.mp.EnvManager.get_agents` asynchronously.
 
-        .. tip::
+        .. note::
 
             Calling each slave environment's manager might be costly in some
-            situations. Therefore, it is advisable to store the returned agent
-            list if the agent sets in the slave environments are not bound to
-            change.
+            situations. Therefore, the returned agent addresses are cached
+            until agents are spawned with this multi-environment's spawning
+            methods or the slave environments are started or stopped. Call
+            :meth:`invalidate_agents_cache` if the agents in the slave
+            environments are changed by other means.
         """
         async def slave_task(mgr_addr, addr=True, agent_cls=None):
-            r_manager = await self.env.connect(mgr_addr, timeout=TIMEOUT)
+            r_manager = await self._get_proxy(mgr_addr)
             return await r_manager.get_agents(addr=addr, agent_cls=agent_cls)
 
-        tasks = create_tasks(slave_task, self.addrs, addr, agent_cls)
-        return run_or_coro(tasks, as_coro)
+        async def get_agents():
+            if not addr:
+                return await create_tasks(slave_task, self.addrs, addr,
+                                          agent_cls)
+            # Invalidation replaces the cache, so a result fetched while the
+            # agents change is stored only to the discarded cache.
+            cache = self._agents_cache
+            agents = cache.get(agent_cls)
+            if agents is None:
+                agents = await create_tasks(slave_task, self.addrs, addr,
+                                            agent_cls)
+                agents = tuple(map(sys.intern, agents))
+                cache[agent_cls] = agents
+            return list(agents)
+
+        return run_or_coro(get_agents(), as_coro)
+
+    def invalidate_agents_cache(self):
+        """Invalidate the agent addresses cached by :meth:`get_agents`.
+        """
+        self._agents_cache = {}
 
     @property
     def addrs(self):
-        """Addresses of the slave environment managers.
+        """Addresses of the slave environment managers as a tuple.
         """
         return self._manager_addrs
 
@@ -496,11 +625,40 @@ class MultiEnvironment():
         """
         return self._artifacts
 
+    @property
+    def age(self):
+        """Age of the multi-environment.
+        """
+        return self._age
+
+    @age.setter
+    def age(self, a):
+        self._age = a
+
     async def connect(self, *args, **kwargs):
         """A shortcut to environment's :meth:`connect`.
         """
         return await self.env.connect(*args, **kwargs)
 
+    async def _get_proxy(self, addr, timeout=TIMEOUT):
+        """Get a proxy to the agent in *addr*, connecting to it only if no
+        proxy has been cached for the address.
+
+        The cached proxies are dropped when the slaves are stopped, and a
+        single proxy can be dropped with :meth:`_drop_proxy`.
+        """
+        proxy = self._proxies.get(addr)
+        if proxy is None:
+            proxy = await self.env.connect(addr, timeout=timeout)
+            self._proxies[addr] = proxy
+        return proxy
+
+    def _drop_proxy(self, addr):
+        """Drop the cached proxy for *addr*, e.g. after a failed call, so that
+        the next call makes a new connection.
+        """
+        self._proxies.pop(addr, None)
+
     def check_ready(self):
         """Check if this multi-environment itself is ready.
 
@@ -525,11 +683,12 @@ class MultiEnvironment():
         """
         async def slave_task(addr, timeout):
             try:
-                r_manager = await self.env.connect(addr, timeout=timeout)
+                r_manager = await self._get_proxy(addr, timeout=timeout)
                 ready = await r_manager.is_ready()
                 if not ready:
                     return False
-            except:
+            except Exception:
+                self._drop_proxy(addr)
                 return False
             return True
 
@@ -537,17 +696,29 @@ class MultiEnvironment():
             return False
         if not self.check_ready():
             return False
-        rets = await create_tasks(slave_task, self.addrs, 0.5)
-        if not all(rets):
-            return False
+        # Probe all slaves concurrently, but stop at the first slave which is
+        # not ready, as the result is then known.
+        tasks = [asyncio.ensure_future(slave_task(a, 0.5)) for a in self.addrs]
+        try:
+            for fut in asyncio.as_completed(tasks):
+                if not await fut:
+                    return False
+        finally:
+            for t in tasks:
+                t.cancel()
         return True
 
     async def spawn_slaves(self, slave_addrs, slave_env_cls, slave_mgr_cls,
-                           slave_kwargs=None):
+                           slave_kwargs=None, pin_slaves=False,
+                           mp_context=None):
         """Spawn slave environments.
 
         :param slave_addrs:
-            List of (HOST, PORT) addresses for the slave-environments.
+            List of addresses for the slave-environments. Each address is
+            either a (HOST, PORT) tuple or a file path for a UNIX domain
+            socket. On a single machine, the sockets have less overhead per
+            message than TCP connections. The socket files are removed when
+            the multi-environment is closed.
 
         :param slave_env_cls: Class for the slave environments.
 
@@ -557,14 +728,34 @@ class MultiEnvironment():
 
         :param slave_mgr_cls:
             Class of the slave environment managers.
+
+        :param bool pin_slaves:
+            If ``True``, pins each slave process to its own CPU (in a round
+            robin fashion if there are more slaves than CPUs available) so
+            that the operating system does not migrate them between the
+            CPUs. Pinning is supported only on platforms which have
+            :func:`os.sched_setaffinity`.
+
+        :param mp_context:
+            Optional. :mod:`multiprocessing` context used to start the slave
+            processes, see :func:`~creamas.mp.spawn_containers`.
+
+        The slave environments are run in their own processes.
         """
         pool, r = spawn_containers(slave_addrs, env_cls=slave_env_cls,
                                    env_params=slave_kwargs,
-                                   mgr_cls=slave_mgr_cls)
+                                   mgr_cls=slave_mgr_cls,
+                                   mp_context=mp_context)
+        if pin_slaves:
+            pin_processes(r)
         self._pool = pool
         self._r = r
-        self._manager_addrs = ["{}{}".format(_get_base_url(a), 0) for
-                               a in slave_addrs]
+        self._manager_addrs = tuple(sys.intern("{}0".format(_get_base_url(a)))
+                                    for a in slave_addrs)
+        self._slave_procs = dict(zip(self._manager_addrs, r))
+        self._socket_paths = [a for a in slave_addrs if isinstance(a, str)]
+        self._agent_counts = None
+        self.invalidate_agents_cache()
 
     async def wait_slaves(self, timeout, check_ready=False):
         """Wait until all slaves are online (their managers accept connections)
@@ -579,6 +770,14 @@ class MultiEnvironment():
             A slave environment is assumed to be ready when its manager's
             :meth:`is_ready`-method returns ``True``.
 
+        :returns:
+            ``True`` if all the slaves became online (or ready) before the
+            timeout, ``False`` otherwise.
+
+        If the slaves were spawned with :meth:`spawn_slaves`, the polling of
+        a slave stops as soon as its process has exited, in which case the
+        method returns ``False``.
+
         .. seealso::
 
             :meth:`creamas.core.environment.Environment.is_ready`,
@@ -591,47 +790,53 @@ class MultiEnvironment():
                   "Waiting for slaves to become {}...".format(status))
         t = time.monotonic()
         online = []
-        while len(online) < len(self.addrs):
-            for addr in self.addrs:
-                if time.monotonic() - t > timeout:
-                    self._log(logging.DEBUG, "Timeout while waiting for the "
-                              "slaves to become {}.".format(status))
+
+        async def slave_task(addr):
+            # Poll the slave with exponentially increasing intervals.
+            delay = 0.01
+            proc = self._slave_procs.get(addr)
+            while time.monotonic() - t <= timeout:
+                if proc is not None and proc.exitcode is not None:
+                    self._log(logging.WARNING, "Slave process for {} exited "
+                              "with code {}.".format(addr, proc.exitcode))
                     return False
-                if addr not in online:
-                    try:
-                        r_manager = await self.env.connect(addr, timeout)
-                        ready = True
-                        if check_ready:
-                            ready = await r_manager.is_ready()
-                        if ready:
-                            online.append(addr)
-                            self._log(logging.DEBUG, "Slave {}/{} {}: {}"
-                                      .format(len(online),
-                                              len(self.addrs),
-                                              status,
-                                              addr))
-                    except:
-                        pass
-            await asyncio.sleep(0.5)
+                try:
+                    r_manager = await self._get_proxy(addr, timeout)
+                    ready = True
+                    if check_ready:
+                        ready = await r_manager.is_ready()
+                    if ready:
+                        online.append(addr)
+                        self._log(logging.DEBUG, "Slave {}/{} {}: {}"
+                                  .format(len(online), len(self.addrs),
+                                          status, addr))
+                        return True
+                except Exception:
+                    self._drop_proxy(addr)
+                await asyncio.sleep(delay)
+                delay = min(2 * delay, 0.5)
+            return False
+
+        rets = await create_tasks(slave_task, self.addrs, flatten=False)
+        if not all(rets):
+            self._log(logging.DEBUG, "Timeout while waiting for the "
+                      "slaves to become {}.".format(status))
+            return False
         self._log(logging.DEBUG, "All slaves {} in {} seconds!"
                   .format(status, time.monotonic() - t))
         return True
 
     def _get_log_folders(self, log_folder, addrs):
         if type(log_folder) is str:
-            import os
-            folders = [os.path.join(log_folder, '_{}'.format(i)) for i in
-                       range(len(addrs))]
-            return folders
-        else:
-            folders = [None for _ in range(len(addrs))]
-            return folders
+            return [os.path.join(log_folder, '_{}'.format(i)) for i in
+                    range(len(addrs))]
+        return [None] * len(addrs)
 
     async def set_host_manager(self, addr, timeout=TIMEOUT):
         """Set this multi-environment's manager as the host manager for
         a manager agent in *addr*
         """
-        r_manager = await self.env.connect(addr, timeout=timeout)
+        r_manager = await self._get_proxy(addr, timeout=timeout)
         return await r_manager.set_host_manager(self.manager.addr)
 
     async def set_host_managers(self, timeout=5):
@@ -651,15 +856,34 @@ class MultiEnvironment():
     async def trigger_act(self, addr):
         """Trigger agent in :attr:`addr` to act.
 
-        This method is quite inefficient if used repeatedly for a large number
-        of agents.
+        The agent is triggered through its slave environment's manager, so
+        that only the managers' proxies need to be kept. This method is
+        quite inefficient if used repeatedly for a large number of agents.
 
         .. seealso::
 
+            :py:meth:`creamas.mp.MultiEnvironment.trigger_acts`,
             :py:meth:`creamas.mp.MultiEnvironment.trigger_all`
         """
-        r_agent = await self.env.connect(addr, timeout=TIMEOUT)
-        return await r_agent.act()
+        r_manager = await self._get_proxy(get_manager(addr))
+        return await r_manager.trigger_act(addr)
+
+    async def trigger_acts(self, addrs, *args, **kwargs):
+        """Trigger agents in *addrs* to :meth:`act` concurrently.
+
+        Given arguments and keyword arguments are passed down to each agent's
+        :meth:`~creamas.core.agent.CreativeAgent.act`.
+
+        :returns:
+            A list of the agents' :meth:`act` return values in the same order
+            as *addrs*.
+        """
+        async def agent_task(addr, *args, **kwargs):
+            r_agent = await self._get_proxy(addr)
+            return await r_agent.act(*args, **kwargs)
+
+        return await create_tasks(agent_task, addrs, *args, flatten=False,
+                                  **kwargs)
 
     async def trigger_all(self, *args, **kwargs):
         """Trigger all agents in all the slave environments to :meth:`act`
@@ -674,7 +898,7 @@ class MultiEnvironment():
             :attr:`manager`, are excluded from acting.
         """
         async def slave_task(addr, *args, **kwargs):
-            r_manager = await self.env.connect(addr, timeout=TIMEOUT)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.trigger_all(*args, **kwargs)
 
         return await create_tasks(slave_task, self.addrs, *args, **kwargs)
@@ -682,14 +906,43 @@ class MultiEnvironment():
     async def _get_smallest_env(self):
         """Get address of the slave environment manager with the smallest
         number of agents.
+
+        The agent counts are queried concurrently from the slave environment
+        managers on the first call and cached on the master. The
+        spawning methods keep the cached counts up to date.
         """
         async def slave_task(mgr_addr):
-            r_manager = await self.env.connect(mgr_addr, timeout=TIMEOUT)
-            ret = await r_manager.get_agents(addr=True)
-            return mgr_addr, len(ret)
+            r_manager = await self._get_proxy(mgr_addr)
+            return await r_manager.get_agent_count()
+
+        if self._agent_counts is None:
+            sizes = await create_tasks(slave_task, self.addrs, flatten=False)
+            self._agent_counts = dict(zip(self.addrs, sizes))
+        return min(self.addrs, key=self._agent_counts.__getitem__)
 
-        sizes = await create_tasks(slave_task, self.addrs, flatten=False)
-        return sorted(sizes, key=lambda x: x[1])[0][0]
+    async def _spawn_counted(self, addr, n, spawn_coro):
+        """Spawn *n* agents to the slave environment in *addr* with
+        *spawn_coro*, or to the smallest slave environment if *addr* is
+        ``None``, keeping the cached agent counts up to date.
+
+        The count is incremented before the agents are spawned, so that
+        concurrent spawns are divided between the slave environments.
+        """
+        if addr is None:
+            addr = await self._get_smallest_env()
+        counts = self._agent_counts
+        if counts is not None and addr in counts:
+            counts[addr] += n
+        self.invalidate_agents_cache()
+        try:
+            r_manager = await self._get_proxy(addr)
+            return await spawn_coro(r_manager)
+        except Exception:
+            # The number of agents in the slave is unknown after a failure.
+            self._agent_counts = None
+            raise
+        finally:
+            self.invalidate_agents_cache()
 
     async def spawn(self, agent_cls, *args, addr=None, **kwargs):
         """Spawn a new agent in a slave environment.
@@ -712,11 +965,18 @@ class MultiEnvironment():
 
             Use :meth:`~creamas.mp.MultiEnvironment.spawn_n` to spawn large
             number of agents with identical initialization parameters.
+
+        .. note::
+
+            The number of agents in each slave environment is cached after
+            the first spawn without *addr*. Agents spawned to or removed from
+            the slave environments by other means than this method and
+            :meth:`spawn_n` are not reflected in the cached counts.
         """
-        if addr is None:
-            addr = await self._get_smallest_env()
-        r_manager = await self.env.connect(addr)
-        return await r_manager.spawn(agent_cls, *args, **kwargs)
+        async def spawn_task(r_manager):
+            return await r_manager.spawn(agent_cls, *args, **kwargs)
+
+        return await self._spawn_counted(addr, 1, spawn_task)
 
     async def spawn_n(self, agent_cls, n, *args, addr=None, **kwargs):
         """Same as :meth:`~creamas.mp.MultiEnvironment.spawn`, but allows
@@ -739,10 +999,74 @@ class MultiEnvironment():
         The ``*args`` and ``**kwargs`` are passed down to each agent's
         ``__init__``.
         """
-        if addr is None:
-            addr = await self._get_smallest_env()
-        r_manager = await self.env.connect(addr)
-        return await r_manager.spawn_n(agent_cls, n, *args, **kwargs)
+        async def spawn_task(r_manager):
+            return await r_manager.spawn_n(agent_cls, n, *args, **kwargs)
+
+        return await self._spawn_counted(addr, n, spawn_task)
+
+    async def spawn_n_all(self, agent_cls, n, *args, **kwargs):
+        """Spawn :attr:`n` agents with the same initialization parameters to
+        **each** slave environment.
+
+        The slave environment managers are called concurrently, see
+        :meth:`~creamas.mp.MultiEnvironment.spawn_n` for the parameters.
+
+        :returns:
+            A list of (:class:`aiomas.rpc.Proxy`, address)-tuples for the
+            spawned agents, grouped by the slave environments in the order of
+            :attr:`addrs`.
+        """
+        async def slave_task(addr):
+            return await self.spawn_n(agent_cls, n, *args, addr=addr, **kwargs)
+
+        return await create_tasks(slave_task, self.addrs)
+
+    async def spawn_many(self, specs, addr=None):
+        """Spawn agents with differing initialization parameters using one
+        call to each slave environment manager.
+
+        :param list specs:
+            A list of ``(agent_cls, args, kwargs)``-tuples, one for each agent
+            to be spawned. See :meth:`~creamas.mp.MultiEnvironment.spawn` for
+            the format of ``agent_cls``.
+        :param str addr:
+            Optional. Address for the slave enviroment's manager.
+            If ``None``, each agent is spawned in the slave environment which
+            has the smallest number of agents at the time it is assigned, as
+            with :meth:`spawn`.
+
+        :returns:
+            A list of (:class:`aiomas.rpc.Proxy`, address)-tuples for the
+            spawned agents in the order of *specs*.
+        """
+        async def slave_task(mgr_addr, idx):
+            batch = [specs[i] for i in idx]
+
+            async def spawn_task(r_manager):
+                return await r_manager.spawn_many(batch)
+
+            return await self._spawn_counted(mgr_addr, len(batch), spawn_task)
+
+        if addr is not None:
+            groups = {addr: list(range(len(specs)))}
+        else:
+            await self._get_smallest_env()
+            # Assign the agents on a copy so that _spawn_counted can update
+            # the cached counts per slave.
+            counts = dict(self._agent_counts)
+            groups = {}
+            for i in range(len(specs)):
+                mgr_addr = min(self.addrs, key=counts.__getitem__)
+                counts[mgr_addr] += 1
+                groups.setdefault(mgr_addr, []).append(i)
+
+        addrs = list(groups)
+        rets = await asyncio.gather(*[slave_task(a, groups[a]) for a in addrs])
+        spawned = [None] * len(specs)
+        for a, ret in zip(addrs, rets):
+            for i, r in zip(groups[a], ret):
+                spawned[i] = r
+        return spawned
 
     def create_connections(self, connection_map, as_coro=False):
         """Create agent connections from the given connection map.
@@ -758,13 +1082,19 @@ class MultiEnvironment():
             calls to the slave environment managers in the event loop.
 
         Only the connections for the agents that are in the slave environments
-        are created.
+        are created. Each slave environment manager is sent only the part of
+        the map concerning its own agents.
         """
-        async def slave_task(addr, connection_map):
-            r_manager = await self.env.connect(addr)
-            return await r_manager.create_connections(connection_map)
+        shards = {}
+        for agent_addr, conns in connection_map.items():
+            shards.setdefault(get_manager(agent_addr), {})[agent_addr] = conns
+
+        async def slave_task(addr):
+            r_manager = await self._get_proxy(addr)
+            return await r_manager.create_connections(shards[addr])
 
-        tasks = create_tasks(slave_task, self.addrs, connection_map)
+        addrs = [a for a in self.addrs if a in shards]
+        tasks = create_tasks(slave_task, addrs)
         return run_or_coro(tasks, as_coro)
 
     def get_connections(self, data=True, as_coro=False):
@@ -782,7 +1112,7 @@ class MultiEnvironment():
             :meth:`creamas.core.environment.Environment.get_connections`
         """
         async def slave_task(addr, data):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.get_connections(data)
 
         tasks = create_tasks(slave_task, self.addrs, data)
@@ -800,17 +1130,35 @@ class MultiEnvironment():
         """
         artifact.env_time = self.age
         self.artifacts.append(artifact)
-        self._log(logging.DEBUG, "ARTIFACTS appended: '{}', length={}"
-                  .format(artifact, len(self.artifacts)))
+        self._artifacts_by_creator.setdefault(artifact.creator,
+                                              []).append(artifact)
+        if self._log_enabled(logging.DEBUG):
+            self._log(logging.DEBUG, "ARTIFACTS appended: '{}', length={}"
+                      .format(artifact, len(self.artifacts)))
 
     def add_artifacts(self, artifacts):
         """Add artifacts to :attr:`artifacts`.
 
         :param artifacts:
             list of :py:class:`~creamas.core.artifact.Artifact` objects
+
+        If a subclass overrides :meth:`add_artifact`, it is called for each
+        artifact. Otherwise the artifacts are added in one go.
         """
+        if type(self).add_artifact is not MultiEnvironment.add_artifact:
+            for artifact in artifacts:
+                self.add_artifact(artifact)
+            return
+        artifacts = list(artifacts)
+        age = self.age
+        by_creator = self._artifacts_by_creator
         for artifact in artifacts:
-            self.add_artifact(artifact)
+            artifact.env_time = age
+            by_creator.setdefault(artifact.creator, []).append(artifact)
+        self.artifacts.extend(artifacts)
+        if self._log_enabled(logging.DEBUG):
+            self._log(logging.DEBUG, "ARTIFACTS extended with {} artifacts, "
+                      "length={}".format(len(artifacts), len(self.artifacts)))
 
     def get_artifacts(self, agent_name=None):
         """Get all artifacts or all artifacts published by a specific agent.
@@ -820,15 +1168,24 @@ class MultiEnvironment():
 
         :returns: All artifacts or all artifacts published by the agent.
         :rtype: list
+
+        The artifacts published by an agent are looked up from an index
+        which :meth:`add_artifact` keeps by the artifacts' creators.
         """
         if agent_name is not None:
-            return [a for a in self.artifacts if agent_name == a.creator]
+            return list(self._artifacts_by_creator.get(agent_name, ()))
         return self.artifacts
 
     def _log(self, level, msg):
         if self.logger is not None:
             self.logger.log(level, msg)
 
+    def _log_enabled(self, level):
+        if self.logger is None:
+            return False
+        is_enabled = getattr(self.logger, 'isEnabledFor', None)
+        return is_enabled is None or is_enabled(level)
+
     def save_info(self, folder, *args, **kwargs):
         """Save information accumulated during the environment's lifetime.
 
@@ -847,14 +1204,21 @@ class MultiEnvironment():
             be made before the timeout expires, the resulting error for that
             particular manager is logged, but the stopping of other managers
             is not halted.
+
+        The stop-messages are sent to all the managers concurrently.
         """
-        for addr in self.addrs:
+        async def slave_task(addr, timeout):
             try:
-                r_manager = await self.env.connect(addr, timeout=timeout)
+                r_manager = await self._get_proxy(addr, timeout=timeout)
                 await r_manager.stop()
-            except:
+            except Exception:
                 self._log(logging.WARNING, "Could not stop {}".format(addr))
 
+        await create_tasks(slave_task, self.addrs, timeout, flatten=False)
+        self._proxies = {}
+        self._agent_counts = None
+        self.invalidate_agents_cache()
+
     def destroy(self, folder=None, as_coro=False):
         """Close the multiprocessing environment and its slave environments.
 
@@ -876,6 +1240,11 @@ class MultiEnvironment():
             if self._pool is not None:
                 self._pool.terminate()
                 self._pool.join()
+            for path in self._socket_paths:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
             await self._env.shutdown(as_coro=True)
             return ret
 
@@ -893,6 +1262,10 @@ def spawn_container(addr, env_cls=Environment,
     installed, this function renames the title of the process to start with
     'creamas' so that the process is easily identifiable, e.g. with
     ``ps -x | grep creamas``.
+
+    If `uvloop <https://pypi.python.org/pypi/uvloop>`_ is installed, the
+    environment is run in an uvloop event loop, which lowers the overhead of
+    each message sent or received by the environment.
     """
     # Try setting the process name to easily recognize the spawned
     # environments with 'ps -x' or 'top'
@@ -901,7 +1274,7 @@ def spawn_container(addr, env_cls=Environment,
         title = 'creamas: {}({})'.format(env_cls.__class__.__name__,
                                          _get_base_url(addr))
         spt.setproctitle(title)
-    except:
+    except ImportError:
         pass
 
     if set_seed:
@@ -909,15 +1282,87 @@ def spawn_container(addr, env_cls=Environment,
 
     # kwargs['codec'] = aiomas.MsgPack
     task = start(addr, env_cls, mgr_cls, *args, **kwargs)
-    loop = asyncio.new_event_loop()
+    loop = _new_event_loop()
     asyncio.set_event_loop(loop)
     loop.run_until_complete(task)
 
 
+def _new_event_loop():
+    """Create a new event loop for a spawned environment, using uvloop if it
+    is available.
+
+    On Python 3.12 and later, the loop's tasks are executed eagerly, so that
+    the tasks which finish without waiting, e.g. on cached values, do not
+    need to be scheduled to the loop.
+    """
+    try:
+        import uvloop
+        loop = uvloop.new_event_loop()
+    except ImportError:
+        loop = asyncio.new_event_loop()
+    if hasattr(asyncio, 'eager_task_factory'):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    return loop
+
+
+def pin_processes(procs):
+    """Pin each process in *procs* to its own CPU.
+
+    The CPUs available to the current process are assigned to the processes
+    in a round robin fashion. Does nothing if the platform does not support
+    :func:`os.sched_setaffinity`.
+
+    :param list procs: A list of started :class:`multiprocessing.Process`.
+
+    :returns: A list of the assigned CPUs in the order of *procs*.
+    """
+    if not hasattr(os, 'sched_setaffinity'):
+        logger.warning("Could not pin processes: CPU affinity is not "
+                       "supported on this platform.")
+        return []
+    cpus = sorted(os.sched_getaffinity(0))
+    assigned = []
+    for i, p in enumerate(procs):
+        cpu = cpus[i % len(cpus)]
+        os.sched_setaffinity(p.pid, {cpu})
+        logger.debug("Pinned process {} to CPU {}.".format(p.pid, cpu))
+        assigned.append(cpu)
+    return assigned
+
+
+class ProcessGroup:
+    """A group of processes running spawned environments.
+
+    The group has the methods of :class:`multiprocessing.pool.Pool` which are
+    used to shut the environments' processes down, so that it can be used in
+    place of a pool.
+    """
+    def __init__(self, processes):
+        self.processes = processes
+
+    def close(self):
+        """Does nothing, the processes are stopped through their managers or
+        by :meth:`terminate`.
+        """
+        pass
+
+    def terminate(self):
+        """Terminate all the processes.
+        """
+        for p in self.processes:
+            p.terminate()
+
+    def join(self):
+        """Wait for all the processes to exit.
+        """
+        for p in self.processes:
+            p.join()
+
+
 def spawn_containers(addrs, env_cls=Environment,
                      env_params=None,
-                     mgr_cls=EnvManager, *args, **kwargs):
-    """Spawn environments in a multiprocessing :class:`multiprocessing.Pool`.
+                     mgr_cls=EnvManager, *args, mp_context=None, **kwargs):
+    """Spawn environments, each in its own :class:`multiprocessing.Process`.
 
     Arguments and keyword arguments are passed down to the created environments
     at initialization time if *env_params* is None. If *env_params* is not
@@ -936,13 +1381,27 @@ def spawn_containers(addrs, env_cls=Environment,
 
     :param mgr_cls:
         Callable for the managers. Must be a subclass of
-        :py:class:`~creamas.mp.EnvManager`.s
+        :py:class:`~creamas.mp.EnvManager`.
+
+    :param mp_context:
+        Optional. :mod:`multiprocessing` context used to start the processes.
+        If ``None``, the default start method is used. A ``'forkserver'``
+        context with the heavy modules preloaded, e.g.::
+
+            ctx = multiprocessing.get_context('forkserver')
+            ctx.set_forkserver_preload(['aiomas', 'numpy', 'creamas.mp'])
+
+        starts the processes from a small server process which has imported
+        the modules only once, instead of copying the whole parent process
+        with ``'fork'`` or importing the modules in each process with
+        ``'spawn'``. The environment and manager classes and their parameters
+        must then be picklable.
 
     :returns:
-        The created process pool and the *ApplyAsync* results for the spawned
-        environments.
+        A :class:`ProcessGroup` of the created processes and a list of the
+        processes in the same order as *addrs*.
     """
-    pool = multiprocessing.Pool(len(addrs))
+    ctx = multiprocessing if mp_context is None else mp_context
     kwargs['env_cls'] = env_cls
     kwargs['mgr_cls'] = mgr_cls
     r = []
@@ -956,12 +1415,11 @@ def spawn_containers(addrs, env_cls=Environment,
         else:
             k = kwargs.copy()
         k['addr'] = addr
-        ret = pool.apply_async(spawn_container,
-                               args=args,
-                               kwds=k,
-                               error_callback=logger.warning)
-        r.append(ret)
-    return pool, r
+        p = ctx.Process(target=spawn_container, args=args, kwargs=k,
+                        daemon=True)
+        p.start()
+        r.append(p)
+    return ProcessGroup(r), r
 
 
 async def start(addr, env_cls, mgr_cls, *env_args, **env_kwargs):
@@ -1005,17 +1463,14 @@ async def start(addr, env_cls, mgr_cls, *env_args, **env_kwargs):
 
 def _set_random_seeds():
     """Set new random seeds for the process.
+
+    SciPy's random functions use NumPy's global random state, so seeding
+    NumPy covers them too.
     """
     try:
         import numpy as np
         np.random.seed()
-    except:
-        pass
-
-    try:
-        import scipy as sp
-        sp.random.seed()
-    except:
+    except ImportError:
         pass
 
     import random
@@ -55,7 +55,7 @@ def connections_from_graph(env, G, edge_data=False):
     node when using :class:`~creamas.mp.MultiEnvironment` or
     :class:`~creamas.ds.DistributedEnvironment`.
     """
-    if not issubclass(G.__class__, (Graph, DiGraph)):
+    if not isinstance(G, (Graph, DiGraph)):
         raise TypeError("Graph structure must be derived from Networkx's "
                         "Graph or DiGraph.")
     if not hasattr(env, 'get_agents'):
@@ -5,14 +5,38 @@
 The module holding :class:`RuleAgent`, an agent which evaluates artifacts using
 its rules.
 """
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+
 from creamas.core.agent import CreativeAgent
 from creamas.rules.rule import Rule, RuleLeaf
 from creamas.util import expose
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 
 __all__ = ['RuleAgent']
 
 
+def _weighted_sum(scores, weights):
+    s = 0.0
+    for i in range(scores.shape[0]):
+        s += scores[i] * weights[i]
+    return s
+
+
+# Use a compiled kernel for the numerator if numba is available.
+if njit is not None:
+    _weighted_sum = njit(cache=True, fastmath=True)(_weighted_sum)
+else:
+    _weighted_sum = np.dot
+
+
 class RuleAgent(CreativeAgent):
     """Base class for agents using rules to evaluate artifacts.
 
@@ -24,11 +48,34 @@ class RuleAgent(CreativeAgent):
 
     :ivar list ~creamas.core.agent.CreativeAgent.W:
         Weight for each rule in **R**, in [-1,1].
+
+    If :attr:`eval_cache_size` is set to a positive number, the evaluations
+    made by :meth:`evaluate` are memoized for that many last artifact objects.
+    The memo is keyed by the identity of the artifact object and holds only
+    weak references to the artifacts. It is cleared whenever the rules or
+    their weights are changed through the agent's methods. Enable the memo
+    only if the rules are pure functions of the artifact and the artifacts
+    are not changed in place after they have been evaluated. By default,
+    :attr:`eval_cache_size` is 0 and nothing is memoized.
+
+    If :attr:`eval_respects_resources` is ``True``, an agent with limited
+    resources does not evaluate artifacts when its current resources are
+    exhausted, but returns ``(0.0, None)`` instead.
     """
+    eval_cache_size = 0
+    _W_ABS_SUM_REFRESH = 1024
+    eval_respects_resources = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._R = []
-        self._W = []
+        self._rules = {}
+        self._active_R = []
+        self._active_W = []
+        self._W_arr = np.zeros(0)
+        self._w_abs_sum = 0.0
+        self._eval_fn = self._compile_evaluator()
+        self._rw_version = 0
+        self._eval_cache = OrderedDict()
 
     @property
     def R(self):
@@ -38,45 +85,43 @@ class RuleAgent(CreativeAgent):
         rule is very prominent in the artifact; 0 means that there is none of
         that rule in the artifact; -1 means that the artifact shows
         traits opposite to the rule.
+
+        The returned list is a snapshot of the agent's current rules.
         """
-        return self._R
+        return list(self._rules)
 
     @property
     def W(self):
         """Weights for the rules.
 
-        Each weight should be in [-1,1].
+        Each weight should be in [-1,1]. The returned list is a snapshot of the
+        agent's current weights, use :meth:`set_weight` to change them.
         """
-        return self._W
+        return list(self._rules.values())
 
     def set_weight(self, rule, weight):
         """Set weight for rule in :attr:`R`.
 
         Adds the rule if it is not in :attr:`R`.
         """
-        if not issubclass(rule.__class__, (Rule, RuleLeaf)):
+        if not isinstance(rule, (Rule, RuleLeaf)):
             raise TypeError("Rule to set weight ({}) is not subclass "
                             "of {} or {}.".format(rule, Rule, RuleLeaf))
         assert (weight >= -1.0 and weight <= 1.0)
-        try:
-            ind = self._R.index(rule)
-            self._W[ind] = weight
-        except:
-            self.add_rule(rule, weight)
+        old = self._rules.get(rule, 0.0)
+        self._rules[rule] = weight
+        self._w_abs_sum += abs(weight) - abs(old)
+        self._weights_changed()
 
     def get_weight(self, rule):
         """Get weight for rule.
 
         If rule is not in :attr:`R`, returns ``None``.
         """
-        if not issubclass(rule.__class__, (Rule, RuleLeaf)):
+        if not isinstance(rule, (Rule, RuleLeaf)):
             raise TypeError("Rule to get weight ({}) is not subclass "
                             "of {} or {}.".format(rule, Rule, RuleLeaf))
-        try:
-            ind = self._R.index(rule)
-            return self._W[ind]
-        except:
-            return None
+        return self._rules.get(rule)
 
     def add_rule(self, rule, weight):
         """Add rule to :attr:`R` with initial weight.
@@ -88,13 +133,14 @@ class RuleAgent(CreativeAgent):
         :returns: ``True`` if rule was successfully added, otherwise ``False``.
         :rtype bool:
         """
-        if not issubclass(rule.__class__, (Rule, RuleLeaf)):
+        if not isinstance(rule, (Rule, RuleLeaf)):
             raise TypeError(
                 "Rule to add ({}) must be derived from {} or {}."
                 .format(rule.__class__, Rule, RuleLeaf))
-        if rule not in self._R:
-            self._R.append(rule)
-            self._W.append(weight)
+        if rule not in self._rules:
+            self._rules[rule] = weight
+            self._w_abs_sum += abs(weight)
+            self._weights_changed()
             return True
         return False
 
@@ -112,20 +158,40 @@ class RuleAgent(CreativeAgent):
             ``True`` if the rule was successfully removed, otherwise ``False``.
         :rtype bool:
         """
-        if not issubclass(rule.__class__, (Rule, RuleLeaf)):
+        if not isinstance(rule, (Rule, RuleLeaf)):
             raise TypeError(
                 "Rule to remove ({}) is not subclass of {} or {}."
                 .format(rule.__class__, Rule, RuleLeaf))
-        try:
-            ind = self._R.index(rule)
-            del self._R[ind]
-            del self._W[ind]
-            return True
-        except:
+        weight = self._rules.pop(rule, None)
+        if weight is None:
             return False
+        self._w_abs_sum -= abs(weight)
+        self._weights_changed()
+        return True
+
+    def _weights_changed(self):
+        """Update cached rules with non-zero weights and their weight vector
+        after :attr:`R` or :attr:`W` has been changed.
+
+        The cached rules are ordered by the descending absolute value of
+        their weights. The sum of absolute weights is updated incrementally by
+        the mutating methods, and recomputed here every
+        :attr:`_W_ABS_SUM_REFRESH` changes to avoid accumulating rounding
+        errors.
+        """
+        active = [(r, w) for r, w in self._rules.items() if w != 0.0]
+        active.sort(key=lambda x: -abs(x[1]))
+        self._active_R = [r for r, _ in active]
+        self._active_W = [w for _, w in active]
+        self._W_arr = np.array(self._active_W, dtype=np.float64)
+        if self._rw_version % self._W_ABS_SUM_REFRESH == 0 or len(active) == 0:
+            self._w_abs_sum = float(np.abs(self._W_arr).sum())
+        self._eval_fn = self._compile_evaluator()
+        self._rw_version += 1
+        self._eval_cache.clear()
 
     @expose
-    def evaluate(self, artifact):
+    def evaluate(self, artifact, eps=None):
         r"""Evaluate artifact with agent's current rules and weights.
 
         :param artifact:
@@ -134,6 +200,14 @@ class RuleAgent(CreativeAgent):
         :type artifact:
             :py:class:`~creamas.core.artifact.Artifact`
 
+        :param float eps:
+            Optional. If given, the rules are evaluated in the descending
+            order of their absolute weights and the evaluation stops when the
+            absolute weights of the remaining rules sum to less than
+            ``eps`` times the sum of all absolute weights. The remaining rules
+            are then treated as if they had evaluated the artifact to 0.
+            Approximate evaluations are not memoized.
+
         :returns:
             Agent's evaluation of the artifact, in [-1,1], and framing. In this
             basic implementation framing is always ``None``.
@@ -151,16 +225,85 @@ class RuleAgent(CreativeAgent):
         where :math:`r_{i}(A)` is the :math:`i` th rule's evaluation on
         artifact :math:`A`, and :math:`w_i` is the weight for rule
         :math:`r_i`.
+
+        Rules with zero weight are not evaluated. The evaluation function is
+        specialized for the current rules and weights each time they are
+        changed. With four or more rules the rule evaluations are collected
+        into an array and the numerator is computed as a dot product.
         """
-        s = 0
-        w = 0.0
-        if len(self.R) == 0:
+        if self.eval_respects_resources and self._max_res and self._cur_res == 0:
             return 0.0, None
 
-        for i in range(len(self.R)):
-            s += self.R[i](artifact) * self.W[i]
-            w += abs(self.W[i])
+        if eps is not None:
+            return self._evaluate_approx(artifact, eps)
+
+        if self.eval_cache_size <= 0:
+            return self._eval_fn(artifact)
+
+        # Artifacts compare equal by their string forms, which do not tell
+        # apart all different objects (e.g. large arrays). Key the memo by
+        # identity, and check with a weak reference that the cached artifact
+        # is still the same object.
+        cache = self._eval_cache
+        key = id(artifact)
+        entry = cache.get(key)
+        if entry is not None and entry[0]() is artifact:
+            cache.move_to_end(key)
+            return entry[1]
+        ret = self._eval_fn(artifact)
+        try:
+            ref = weakref.ref(artifact)
+        except TypeError:
+            return ret
+        cache[key] = (ref, ret)
+        cache.move_to_end(key)
+        if len(cache) > self.eval_cache_size:
+            cache.popitem(last=False)
+        return ret
 
-        if w == 0.0:
+    def _evaluate_approx(self, artifact, eps):
+        if len(self._active_R) == 0:
             return 0.0, None
-        return s / w, None
+
+        w_abs_sum = self._w_abs_sum
+        limit = eps * w_abs_sum
+        remaining = w_abs_sum
+        s = 0.0
+        for rule, w in zip(self._active_R, self._active_W):
+            if remaining < limit:
+                break
+            s += rule(artifact) * w
+            remaining -= abs(w)
+        return s / w_abs_sum, None
+
+    def _compile_evaluator(self):
+        """Build an evaluation function specialized for the current rules and
+        weights.
+
+        The rules, weights and the sum of absolute weights are bound to the
+        returned closure, so that evaluation does not need to look them up
+        from the agent.
+        """
+        R = tuple(self._active_R)
+        W = tuple(self._active_W)
+        W_arr = self._W_arr
+        w_abs_sum = self._w_abs_sum
+        n = len(R)
+
+        if n == 0:
+            def _evaluate(artifact):
+                return 0.0, None
+        elif n < 4:
+            pairs = tuple(zip(R, W))
+
+            def _evaluate(artifact):
+                s = 0.0
+                for rule, w in pairs:
+                    s += rule(artifact) * w
+                return s / w_abs_sum, None
+        else:
+            def _evaluate(artifact):
+                scores = np.fromiter((rule(artifact) for rule in R),
+                                     dtype=np.float64, count=n)
+                return float(_weighted_sum(scores, W_arr)) / w_abs_sum, None
+        return _evaluate
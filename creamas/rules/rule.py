@@ -57,6 +57,9 @@ class RuleLeaf():
             return ret
         return not ret
 
+    def __hash__(self):
+        return hash(self.__feat)
+
     @property
     def domains(self):
         """Domains for this rule leaf.
@@ -162,7 +165,7 @@ class Rule():
 
         :param float weight: Weight of the subrule
         """
-        if not issubclass(subrule.__class__, (Rule, RuleLeaf)):
+        if not isinstance(subrule, (Rule, RuleLeaf)):
             raise TypeError("Rule's class must be (subclass of) {} or {}, got "
                             "{}.".format(Rule, RuleLeaf, subrule.__class__))
         self.__domains = set.union(self.__domains, subrule.domains)
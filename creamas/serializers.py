@@ -6,6 +6,7 @@ Predefined serializers for routers.
 """
 import pickle
 
+import numpy as np
 from numpy import array, ndarray
 
 from creamas.core.artifact import Artifact
@@ -27,16 +28,37 @@ def artifact_serializer():
 
 
 def array_serializer():
-    """Basic serializer for :class¨:`~numpy.array` objects using pickle.
+    """Basic serializer for :class¨:`~numpy.array` objects.
 
     This serializer requires attr:`~aiomas.codecs.MsgPack` codec to work.
+
+    .. seealso::
+
+        :func:`~creamas.serializers.ndarray_serializer`
     """
-    return array, pickle.dumps, pickle.loads
+    return array, _dump_ndarray, _load_ndarray
 
 
 def ndarray_serializer():
-    """Basic serializer for :class¨:`~numpy.ndarray` objects using pickle.
+    """Basic serializer for :class¨:`~numpy.ndarray` objects.
+
+    Arrays are sent as their dtype, shape and raw data buffer, which msgpack
+    packs as a single binary blob. Arrays holding Python objects and arrays
+    with structured dtypes are pickled.
 
     This serializer requires attr:`~aiomas.codecs.MsgPack` codec to work.
     """
-    return ndarray, pickle.dumps, pickle.loads
+    return ndarray, _dump_ndarray, _load_ndarray
+
+
+def _dump_ndarray(arr):
+    if arr.dtype.hasobject or arr.dtype.fields is not None:
+        return pickle.dumps(arr)
+    return [arr.dtype.str, arr.shape, np.ascontiguousarray(arr).tobytes()]
+
+
+def _load_ndarray(data):
+    if isinstance(data, bytes):
+        return pickle.loads(data)
+    dtype, shape, buf = data
+    return np.frombuffer(bytearray(buf), dtype=dtype).reshape(shape)
@@ -29,8 +29,9 @@ def expose(*args, **kwargs):
 def create_tasks(task_coro, addrs, *args, flatten=True, **kwargs):
     """Create and schedule a set of asynchronous tasks.
 
-    The function creates the tasks using a given list of agent addresses and
-    wraps each of them in :func:`asyncio.ensure_future`. The ``*args`` and
+    The function creates a coroutine for each agent address in a given list,
+    and :func:`asyncio.gather` schedules them when the returned coroutine is
+    awaited. The ``*args`` and
     ``**kwargs`` are passed down to :func:`task_coro` when creating tasks for
     each address in :attr:`addrs`.
 
@@ -58,10 +59,7 @@ def create_tasks(task_coro, addrs, *args, flatten=True, **kwargs):
         An awaitable coroutine which returns the results of tasks as a list or
         as a flattened list
     """
-    tasks = []
-    for agent_addr in addrs:
-        task = asyncio.ensure_future(task_coro(agent_addr, *args, **kwargs))
-        tasks.append(task)
+    tasks = [task_coro(agent_addr, *args, **kwargs) for agent_addr in addrs]
     return wait_tasks(tasks, flatten)
 
 
@@ -69,7 +67,7 @@ async def wait_tasks(tasks, flatten=True):
     """Gather a list of asynchronous tasks and wait for their completion.
 
     :param list tasks:
-        A list of *asyncio* tasks wrapped in :func:`asyncio.ensure_future`.
+        A list of coroutines or *asyncio* tasks.
     :param bool flatten:
         If ``True`` the returned results are flattened into one list if the
         tasks return iterable objects. The parameter does nothing if all the
@@ -210,7 +208,7 @@ def split_addrs(addrs):
 def get_manager(addr):
     """Get assumed environment manager's address for a given agent address.
     """
-    return addr.rsplit("/", 1)[0] + "/0"
+    return addr[:addr.rfind("/")] + "/0"
 
 
 def addrs2managers(addrs):
@@ -222,8 +220,5 @@ def addrs2managers(addrs):
     """
     mgrs = {}
     for addr in addrs:
-        mgr_addr = get_manager(addr)
-        if mgr_addr not in mgrs:
-            mgrs[mgr_addr] = []
-        mgrs[mgr_addr].append(addr)
+        mgrs.setdefault(get_manager(addr), []).append(addr)
     return mgrs
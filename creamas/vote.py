@@ -25,11 +25,12 @@ distributed systems.
 """
 import logging
 import operator
-from collections import Counter
-from random import shuffle
+from random import random, shuffle
+
+import numpy as np
 
 from creamas import CreativeAgent, Environment, EnvManager
-from creamas.util import create_tasks, run, expose
+from creamas.util import create_tasks, run, run_or_coro, expose
 
 TIMEOUT = 5
 
@@ -159,11 +160,7 @@ class VoteEnvironment(Environment):
             A list of votes. Each vote is a list of ``(artifact, preference)``
             -tuples sorted in a preference order of a single agent.
         """
-        votes = []
-        for a in self.get_agents(addr=False):
-            vote = a.vote(candidates)
-            votes.append(vote)
-        return votes
+        return [a.vote(candidates) for a in self.get_agents(addr=False)]
 
 
 class VoteManager(EnvManager):
@@ -199,9 +196,13 @@ class VoteManager(EnvManager):
 
     @expose
     def get_votes(self, candidates):
-        self.env._candidates = candidates
-        votes = self.env.gather_votes()
-        return votes
+        """Get votes for the given candidates from the agents in the managed
+        environment.
+
+        Same as :meth:`gather_votes`, but not a coroutine. The candidates of
+        the managed environment are not changed.
+        """
+        return self.env.gather_votes(candidates)
 
     @expose
     async def gather_votes(self, candidates):
@@ -213,6 +214,20 @@ class VoteManager(EnvManager):
         """
         return self.env.gather_votes(candidates)
 
+    @expose
+    async def validate_and_vote(self, candidates):
+        """Validate the candidates and gather votes for the validated
+        candidates from the agents in the managed environment.
+
+        Does the same as :meth:`validate_candidates` followed by
+        :meth:`gather_votes` in one call.
+
+        :returns:
+            A tuple of the validated candidates and the votes for them.
+        """
+        valid = self.env.validate_candidates(candidates)
+        return valid, self.env.gather_votes(valid)
+
 
 class VoteOrganizer:
     """A class which organizes voting behavior in an environment.
@@ -236,6 +251,7 @@ class VoteOrganizer:
         self.logger = logger
         self._single_env = self._determine_single_env(environment)
         self._managers = None if self._single_env else []
+        self._proxies = {}
 
     @property
     def env(self):
@@ -256,19 +272,32 @@ class VoteOrganizer:
         return self._votes
 
     def _determine_single_env(self, env):
-        if issubclass(env.__class__, VoteEnvironment):
+        if isinstance(env, VoteEnvironment):
             return True
         return False
 
     def get_managers(self):
         """Get managers for the slave environments.
+
+        The managers are asked from the environment until it returns
+        a non-empty list, which is then cached.
         """
         if self._single_env:
             return None
-        if not hasattr(self, '_managers'):
+        if not self._managers:
             self._managers = self.env.get_slave_managers()
         return self._managers
 
+    async def _get_proxy(self, addr):
+        """Get a proxy to the slave environment manager in *addr*, connecting
+        to it only if no proxy has been cached for the address.
+        """
+        proxy = self._proxies.get(addr)
+        if proxy is None:
+            proxy = await self.env.connect(addr)
+            self._proxies[addr] = proxy
+        return proxy
+
     def gather_votes(self):
         """Gather votes from all the underlying slave environments for the
         current list of candidates.
@@ -276,7 +305,7 @@ class VoteOrganizer:
         The votes are stored in :attr:`votes`, overriding any previous votes.
         """
         async def slave_task(addr, candidates):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.gather_votes(candidates)
 
         if len(self.candidates) == 0:
@@ -299,7 +328,7 @@ class VoteOrganizer:
         previous candidates.
         """
         async def slave_task(addr):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.get_candidates()
 
         if self._single_env:
@@ -309,24 +338,31 @@ class VoteOrganizer:
             tasks = create_tasks(slave_task, managers)
             self._candidates = run(tasks)
 
-    def clear_candidates(self, clear_env=True):
+    def clear_candidates(self, clear_env=True, as_coro=False):
         """Clear the current candidates.
 
         :param bool clear_env:
             If ``True``, clears also environment's (or its underlying slave
             environments') candidates.
+
+        :param bool as_coro:
+            If ``True`` returns a coroutine which clears the candidates when
+            awaited, otherwise clears the candidates in the event loop.
         """
         async def slave_task(addr):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.clear_candidates()
 
-        self._candidates = []
-        if clear_env:
-            if self._single_env:
-                self.env.clear_candidates()
-            else:
-                managers = self.get_managers()
-                run(create_tasks(slave_task, managers))
+        async def clear():
+            self._candidates = []
+            if clear_env:
+                if self._single_env:
+                    self.env.clear_candidates()
+                else:
+                    managers = self.get_managers()
+                    await create_tasks(slave_task, managers)
+
+        return run_or_coro(clear(), as_coro)
 
     def validate_candidates(self):
         """Validate current candidates.
@@ -340,7 +376,7 @@ class VoteOrganizer:
         distributed environments.
         """
         async def slave_task(addr, candidates):
-            r_manager = await self.env.connect(addr)
+            r_manager = await self._get_proxy(addr)
             return await r_manager.validate_candidates(candidates)
 
         self._log(logging.DEBUG, "Validating {} candidates"
@@ -353,11 +389,41 @@ class VoteOrganizer:
             mgrs = self.get_managers()
             tasks = create_tasks(slave_task, mgrs, candidates, flatten=False)
             rets = run(tasks)
-            valid_candidates = set(self.candidates)
-            for r in rets:
-                valid_candidates = valid_candidates.intersection(set(r))
-            self._candidates = list(valid_candidates)
+            self._candidates = _intersect_candidates(candidates, rets)
+
+        self._log(logging.DEBUG, "{} candidates after validation"
+                  .format(len(self.candidates)))
+
+    def validate_and_gather_votes(self):
+        """Validate current candidates and gather votes for the validated
+        candidates.
+
+        Does the same as :meth:`validate_candidates` followed by
+        :meth:`gather_votes`, but in multi-environments and distributed
+        environments each slave environment is called only once. Each slave
+        votes for the candidates it validated, and the votes for candidates
+        which were not validated in all the slaves are then removed.
+        """
+        async def slave_task(addr, candidates):
+            r_manager = await self._get_proxy(addr)
+            return await r_manager.validate_and_vote(candidates)
 
+        if self._single_env or len(self.candidates) == 0:
+            self.validate_candidates()
+            self.gather_votes()
+            return
+
+        self._log(logging.DEBUG, "Validating and gathering votes for {} "
+                  "candidates.".format(len(self.candidates)))
+        candidates = self.candidates
+        mgrs = self.get_managers()
+        tasks = create_tasks(slave_task, mgrs, candidates, flatten=False)
+        rets = run(tasks)
+        self._candidates = _intersect_candidates(candidates,
+                                                 [r[0] for r in rets])
+        valid = set(self._candidates)
+        self._votes = [[e for e in vote if e[0] in valid]
+                       for r in rets for vote in r[1]]
         self._log(logging.DEBUG, "{} candidates after validation"
                   .format(len(self.candidates)))
 
@@ -375,11 +441,28 @@ class VoteOrganizer:
         :param int winners: The number of vote winners
 
         :returns: Winner(s) of the vote.
+
+        If *voting_method* is :func:`~creamas.vote.vote_random`, the votes are
+        not gathered as they would not be used, and :attr:`votes` keeps any
+        previously gathered votes. As with the other voting methods, no
+        winners are returned if there are no candidates or no agents to vote.
         """
         self.gather_candidates()
+        if voting_method is vote_random:
+            if validate:
+                self.validate_candidates()
+            if len(self.candidates) == 0 or len(self.env.get_agents()) == 0:
+                self._log(logging.DEBUG, "Could not compute results as there "
+                          "are no candidates or voters!")
+                return []
+            self._log(logging.DEBUG, "Computing random results for {} "
+                      "candidates without gathering votes."
+                      .format(len(self.candidates)))
+            return vote_random(self.candidates, [], winners, **kwargs)
         if validate:
-            self.validate_candidates()
-        self.gather_votes()
+            self.validate_and_gather_votes()
+        else:
+            self.gather_votes()
         r = self.compute_results(voting_method, self.votes, winners=winners, **kwargs)
         return r
 
@@ -431,6 +514,45 @@ class VoteOrganizer:
             self.logger.log(level, msg)
 
 
+def _intersect_candidates(candidates, valid_lists):
+    """Return the candidates which are in all of the *valid_lists*, in the
+    order of *candidates*.
+
+    The original candidate objects are returned, as the candidates in the
+    lists may be deserialized copies of them.
+    """
+    # Mark each list's candidates in a row of a boolean matrix, so that each
+    # candidate is hashed only once per list.
+    idx = {c: i for i, c in enumerate(candidates)}
+    masks = np.zeros((len(valid_lists), len(candidates)), dtype=bool)
+    for r, row in zip(valid_lists, masks):
+        row[[idx[c] for c in r if c in idx]] = True
+    keep = masks.all(axis=0)
+    return [c for c, k in zip(candidates, keep) if k]
+
+
+def _candidate_indexer(candidates):
+    """Return a function which maps voted artifacts to their indices in
+    *candidates*.
+
+    The artifacts are matched to the candidates by their string
+    representation. The candidates' strings are computed only once, and the
+    artifacts which are the candidates themselves are matched by their
+    identity without computing their strings again.
+    """
+    strs = [str(c) for c in candidates]
+    index = {s: i for i, s in enumerate(strs)}
+    by_id = {id(c): index[s] for c, s in zip(candidates, strs)}
+
+    def indexer(artifact):
+        i = by_id.get(id(artifact))
+        if i is None:
+            i = index[str(artifact)]
+        return i
+
+    return indexer
+
+
 def vote_random(candidates, votes, n_winners):
     """Select random winners from the candidates.
 
@@ -459,19 +581,16 @@ def vote_least_worst(candidates, votes, n_winners):
     :param votes: Votes from the agents
     :param int n_winners: The number of vote winners
     """
-    worsts = {str(c): 100000000.0 for c in candidates}
+    indexer = _candidate_indexer(candidates)
+    worsts = {i: 100000000.0 for i in map(indexer, candidates)}
     for v in votes:
         for e in v:
-            if worsts[str(e[0])] > e[1]:
-                worsts[str(e[0])] = e[1]
+            i = indexer(e[0])
+            if worsts[i] > e[1]:
+                worsts[i] = e[1]
     s = sorted(worsts.items(), key=lambda x: x[1], reverse=True)
     best = s[:min(n_winners, len(candidates))]
-    d = []
-    for e in best:
-        for c in candidates:
-            if str(c) == e[0]:
-                d.append((c, e[1]))
-    return d
+    return [(candidates[i], w) for i, w in best]
 
 
 def vote_best(candidates, votes, n_winners):
@@ -491,32 +610,6 @@ def vote_best(candidates, votes, n_winners):
     return best
 
 
-def _remove_zeros(votes, fpl, cl, ranking):
-    """Remove zeros in IRV voting.
-    """
-    for v in votes:
-        for r in v:
-            if r not in fpl:
-                v.remove(r)
-    for c in cl:
-        if c not in fpl:
-            if c not in ranking:
-                ranking.append((c, 0))
-
-
-def _remove_last(votes, fpl, cl, ranking):
-    """Remove last candidate in IRV voting.
-    """
-    for v in votes:
-        for r in v:
-            if r == fpl[-1]:
-                v.remove(r)
-    for c in cl:
-        if c == fpl[-1]:
-            if c not in ranking:
-                ranking.append((c, len(ranking) + 1))
-
-
 def vote_IRV(candidates, votes, n_winners):
     """Perform IRV voting based on votes.
 
@@ -525,25 +618,46 @@ def vote_IRV(candidates, votes, n_winners):
     :param candidates: All candidates in the vote
     :param votes: Votes from the agents
     :param int n_winners: The number of vote winners
+
+    :returns:
+        A list of ``(candidate, rank)``-tuples, winner first. The rank of a
+        candidate is its position in the elimination order, the winner having
+        the highest rank.
+
+    Each vote keeps a cursor to its most preferred candidate which has not
+    been eliminated, and each candidate keeps the votes whose cursor points
+    to it. When a candidate is eliminated, only the cursors of its own votes
+    are advanced. The voted artifacts are matched to the candidates by their
+    string representation.
     """
-    # TODO: Check what is wrong in here.
-    votes = [[e[0] for e in v] for v in votes]
-    f = lambda x: Counter(e[0] for e in x).most_common()
-    cl = list(candidates)
-    ranking = []
-    fp = f(votes)
-    fpl = [e[0] for e in fp]
-
-    while len(fpl) > 1:
-        _remove_zeros(votes, fpl, cl, ranking)
-        _remove_last(votes, fpl, cl, ranking)
-        cl = fpl[:-1]
-        fp = f(votes)
-        fpl = [e[0] for e in fp]
-
-    ranking.append((fpl[0], len(ranking) + 1))
-    ranking = list(reversed(ranking))
-    return ranking[:min(n_winners, len(ranking))]
+    indexer = _candidate_indexer(candidates)
+    ballots = [[indexer(e[0]) for e in v] for v in votes]
+    pos = [0] * len(ballots)
+    alive = set(range(len(candidates)))
+    tops = {i: [] for i in alive}
+    for b, ballot in enumerate(ballots):
+        if len(ballot) > 0:
+            tops[ballot[0]].append(b)
+
+    eliminated = []
+    while len(alive) > 1:
+        loser = min(alive, key=lambda i: (len(tops[i]), random()))
+        alive.remove(loser)
+        eliminated.append(loser)
+        for b in tops.pop(loser):
+            ballot = ballots[b]
+            p = pos[b] + 1
+            while p < len(ballot) and ballot[p] not in alive:
+                p += 1
+            pos[b] = p
+            if p < len(ballot):
+                tops[ballot[p]].append(b)
+
+    eliminated.extend(alive)
+    # Walk the elimination order backwards only as far as the winners reach.
+    n = len(eliminated)
+    return [(candidates[eliminated[r]], r + 1)
+            for r in range(n - 1, max(n - n_winners, 0) - 1, -1)]
 
 
 def vote_mean(candidates, votes, n_winners):
@@ -558,19 +672,23 @@ def vote_mean(candidates, votes, n_winners):
     :param candidates: All candidates in the vote
     :param votes: Votes from the agents
     :param int n_winners: The number of vote winners
+
+    The voted artifacts are matched to the candidates by their string
+    representation, as the votes may hold copies of the candidates, e.g. when
+    they have been gathered from slave environments. Candidates without any
+    votes are omitted from the results.
     """
-    sums = {str(candidate): [] for candidate in candidates}
+    indexer = _candidate_indexer(candidates)
+    idx = []
+    prefs = []
     for vote in votes:
         for v in vote:
-            sums[str(v[0])].append(v[1])
-    for s in sums:
-        sums[s] = sum(sums[s]) / len(sums[s])
-    ordering = list(sums.items())
-    ordering.sort(key=operator.itemgetter(1), reverse=True)
-    best = ordering[:min(n_winners, len(ordering))]
-    d = []
-    for e in best:
-        for c in candidates:
-            if str(c) == e[0]:
-                d.append((c, e[1]))
-    return d
+            idx.append(indexer(v[0]))
+            prefs.append(v[1])
+    idx = np.array(idx, dtype=np.intp)
+    sums = np.bincount(idx, weights=prefs, minlength=len(candidates))
+    counts = np.bincount(idx, minlength=len(candidates))
+    voted = np.flatnonzero(counts)
+    means = sums[voted] / counts[voted]
+    order = np.argsort(-means, kind='stable')[:n_winners]
+    return [(candidates[voted[i]], float(means[i])) for i in order]
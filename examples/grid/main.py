@@ -167,16 +167,12 @@ class DistributedGridEnvironment(DistributedEnvironment):
                     N = self.grid[i][j-1]
                 if j != len(self.grid[0]) - 1:
                     S = self.grid[i][j+1]
-                task = asyncio.ensure_future(self._set_node_neighbors(addr, N, E, S, W))
-                tasks.append(task)
+                tasks.append(self._set_node_neighbors(addr, N, E, S, W))
         await asyncio.gather(*tasks)
 
         self.logger.debug("Setting grid neighbors for the slave environments "
                           "and their agents.")
-        tasks = []
-        for addr in self.addrs:
-            task = asyncio.ensure_future(self._set_neighbors(addr))
-            tasks.append(task)
+        tasks = [self._set_neighbors(addr) for addr in self.addrs]
         await asyncio.gather(*tasks)
         self.logger.debug("All grid neighbors set in {} seconds."
                           .format(time.time() - t))
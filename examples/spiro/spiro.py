@@ -6,7 +6,12 @@ Simple Spirograph code, adapted from https://gist.github.com/alvesjnr/1948754
 """
 import math
 import numpy as np
-from scipy import misc
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
 
 PI = np.pi
 
@@ -36,18 +41,106 @@ def give_dots(R, r, r_, resolution=2*PI/1000, spins=50):
     return x, y
 
 
+def _draw_dots(img, R, r, r_, resolution, spins):
+    """Draw Spirograph dots to a square canvas centered at the origin, one dot
+    at a time.
+    """
+    Rr = R - r
+    k = Rr / r
+    half = img.shape[0] // 2
+    n = int(math.ceil(2*PI*spins / resolution))
+    for i in range(n):
+        theta = i * resolution
+        x = int(round(Rr*math.cos(theta) + r_*math.cos(k*theta))) + half
+        y = int(round(Rr*math.sin(theta) - r_*math.sin(k*theta))) + half
+        if 0 <= x < img.shape[0] and 0 <= y < img.shape[1]:
+            img[x, y] = 0
+
+
+if njit is not None:
+    _draw_dots = njit(cache=True, fastmath=True)(_draw_dots)
+
+
+def _draw_dots_batch(imgs, R, rs, r_s, resolution, spins):
+    """Draw Spirograph dots for each (*rs[i]*, *r_s[i]*) to *imgs[i]*.
+    """
+    for i in prange(imgs.shape[0]):
+        _draw_dots(imgs[i], R, rs[i], r_s[i], resolution, spins)
+
+
+if njit is not None:
+    _draw_dots_batch = njit(parallel=True, fastmath=True)(_draw_dots_batch)
+
+
+def spiro_canvas(R, r, r_, resolution=2*PI/1000, spins=50, size=500):
+    """Draw Spirograph dots to a white *size* x *size* uint8 canvas centered at
+    the origin. Dots outside the canvas are ignored.
+
+    If numba is available, the dots are drawn with a compiled loop which does
+    not allocate the dot coordinate arrays. Otherwise, the dots are drawn to a
+    canvas with a one pixel margin, and the dot coordinates are clipped into
+    the canvas so that the dots outside it land on the margin. The returned
+    image is a view without the margin.
+    """
+    if njit is not None:
+        img = np.full([size, size], 255, dtype=np.uint8)
+        _draw_dots(img, R, r, r_, resolution, spins)
+        return img
+
+    img = np.full([size + 2, size + 2], 255, dtype=np.uint8)
+    x, y = give_dots(R, r, r_, resolution=resolution, spins=spins)
+    offset = size // 2 + 1
+    ix = np.rint(x).astype(np.intp)
+    iy = np.rint(y).astype(np.intp)
+    ix += offset
+    iy += offset
+    np.clip(ix, 0, size + 1, out=ix)
+    np.clip(iy, 0, size + 1, out=iy)
+    img[ix, iy] = 0
+    return img[1:-1, 1:-1]
+
+
+def spiro_canvases(R, params, resolution=2*PI/1000, spins=50, size=500):
+    """Draw a canvas with :func:`spiro_canvas` for each (r, r_) row in
+    *params*.
+
+    If numba is available, the canvases are drawn in parallel.
+
+    :returns: uint8 array of shape (len(params), size, size).
+    """
+    params = np.asarray(params, dtype=np.float64)
+    if njit is None:
+        return np.stack([spiro_canvas(R, r, r_, resolution, spins, size)
+                         for r, r_ in params])
+    imgs = np.full([len(params), size, size], 255, dtype=np.uint8)
+    _draw_dots_batch(imgs, R, np.ascontiguousarray(params[:, 0]),
+                     np.ascontiguousarray(params[:, 1]), resolution, spins)
+    return imgs
+
+
+def box_downsample(img, size):
+    """Downsample uint8 image to a float32 image of given *size* with values in
+    [0, 1].
+
+    Each pixel in the downsampled image is the average of a box of pixels in
+    the original image. The boxes are as equal in size as possible, so the
+    original image's sides do not need to be multiples of the new sides.
+
+    :param img:
+        uint8 image, or a stack of images. The images are in the last two
+        dimensions.
+    :param size: (rows, columns) of the downsampled image.
+    """
+    redges = np.linspace(0, img.shape[-2], size[0] + 1).astype(np.int64)
+    cedges = np.linspace(0, img.shape[-1], size[1] + 1).astype(np.int64)
+    sums = np.add.reduceat(img, redges[:-1], axis=-2, dtype=np.uint32)
+    sums = np.add.reduceat(sums, cedges[:-1], axis=-1)
+    areas = np.outer(np.diff(redges), np.diff(cedges)) * 255.0
+    return (sums / areas).astype(np.float32)
+
+
 def spiro_image(R, r, r_, resolution=2*PI/1000, spins=50, size=[32, 32]):
-    """Create image with given Spirograph parameters using numpy and scipy.
-    """
-    x, y = give_dots(200, r, r_, spins=20)
-    xy = np.array([x, y]).T
-    xy = np.array(np.around(xy), dtype=np.int64)
-    xy = xy[(xy[:, 0] >= -250) & (xy[:, 1] >= -250) &
-            (xy[:, 0] < 250) & (xy[:, 1] < 250)]
-    xy = xy + 250
-    img = np.ones([500, 500], dtype=np.uint8)
-    img[:] = 255
-    img[xy[:, 0], xy[:, 1]] = 0
-    img = misc.imresize(img, size)
-    fimg = img / 255.0
-    return fimg
+    """Create image with given Spirograph parameters using numpy.
+    """
+    img = spiro_canvas(200, r, r_, spins=20)
+    return box_downsample(img, size)
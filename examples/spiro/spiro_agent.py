@@ -19,7 +19,7 @@ France.
 import os
 import sys
 import time
-from collections import Counter
+from collections import Counter, deque
 import functools
 import logging
 import operator
@@ -32,7 +32,7 @@ from creamas import Artifact
 from creamas.math import gaus_pdf
 from creamas.vote import VoteAgent, VoteEnvironment, VoteOrganizer, vote_mean
 
-from spiro import give_dots, give_dots_yield, spiro_image
+from spiro import box_downsample, spiro_canvas, spiro_image
 
 class SpiroAgent(VoteAgent):
     """Agent that creates spirographs and evaluates them with short term memory
@@ -129,20 +129,11 @@ class SpiroAgent(VoteAgent):
 
     def create(self, r, r_, R=200):
         """Create new spirograph image with given arguments. Returned image is
-        scaled to agent's preferred image size.
+        scaled to agent's preferred image size and has float32 pixel values in
+        [0, 1].
         """
-        x, y = give_dots(R, r, r_, spins=20)
-        xy = np.array([x, y]).T
-        xy = np.array(np.around(xy), dtype=np.int64)
-        xy = xy[(xy[:, 0] >= -250) & (xy[:, 1] >= -250) &
-                (xy[:, 0] < 250) & (xy[:, 1] < 250)]
-        xy = xy + 250
-        img = np.ones([500, 500], dtype=np.uint8)
-        img[:] = 255
-        img[xy[:, 0], xy[:, 1]] = 0
-        img = misc.imresize(img, [self.img_size, self.img_size])
-        fimg = img / 255.0
-        return fimg
+        img = spiro_canvas(R, r, r_, spins=20)
+        return box_downsample(img, [self.img_size, self.img_size])
 
     def randomize_args(self):
         """Get new parameters for spirograph generation near agent's current
@@ -191,19 +182,19 @@ class SpiroAgent(VoteAgent):
         :returns: Best created artifact.
         :rtype: :py:class:`~creamas.core.agent.Artifact`
         """
-        args = self.randomize_args()
-        img = self.create(args[0], args[1])
-        best_artifact = SpiroArtifact(self, img, domain='image')
-        ev, _ = self.evaluate(best_artifact)
-        best_artifact.add_eval(self, ev, fr={'args': args})
-        for i in range(n-1):
+        assert n >= 1, "At least one spirograph must be created."
+        best_artifact = None
+        best_ev = -np.inf
+        for i in range(n):
             args = self.randomize_args()
             img = self.create(args[0], args[1])
             artifact = SpiroArtifact(self, img, domain='image')
             ev, _ = self.evaluate(artifact)
             artifact.add_eval(self, ev, fr={'args': args})
-            if ev > best_artifact.evals[self.name]:
-                best_artifact = artifact
+            # The first candidate is always accepted, so that NaN
+            # evaluations still produce an artifact.
+            if i == 0 or ev > best_ev:
+                best_artifact, best_ev = artifact, ev
         self.spiro_args = best_artifact.framings[self.name]['args']
         best_artifact.in_domain = False
         best_artifact.self_criticism = 'reject'
@@ -272,7 +263,7 @@ class SpiroAgent(VoteAgent):
             dists = []
             for a in ars:
                 args = a.framings[a.creator]['args']
-                d = np.sqrt(np.sum(np.square(args - self.spiro_args)))
+                d = np.linalg.norm(args - self.spiro_args)
                 dists.append((d,a))
             dists.sort(key=operator.itemgetter(0))
             for d,a in dists[:amount]:
@@ -342,7 +333,7 @@ class SpiroAgent(VoteAgent):
             mdist = np.sqrt(spiro1.flatten().shape[0])
             for a2 in accepted[:j]:
                 spiro2 = a2.obj
-                dist = np.sqrt(np.sum(np.square(spiro1.flatten() - spiro2.flatten())))
+                dist = np.linalg.norm(spiro1 - spiro2)
                 if dist < mdist:
                     mdist = dist
             distances.append(mdist)
@@ -511,7 +502,7 @@ class SpiroEnvironment(VoteEnvironment):
             mdist = np.sqrt(spiro1.flatten().shape[0])
             for a2 in sort_arts[:i]:
                 spiro2 = a2.obj
-                dist = np.sqrt(np.sum(np.square(spiro1.flatten() - spiro2.flatten())))
+                dist = np.linalg.norm(spiro1 - spiro2)
                 if dist < mdist:
                     mdist = dist
             if a1.accepted:
@@ -702,16 +693,14 @@ class SpiroEnvironment(VoteEnvironment):
 
 
 class STMemory():
-    """Agent's short-term memory model using a simple list which stores
-    artifacts as is."""
+    """Agent's short-term memory model using a bounded deque which stores
+    artifacts as is. The newest artifact is first."""
     def __init__(self, length):
         self.length = length
-        self.artifacts = []
+        self.artifacts = deque(maxlen=length)
 
     def _add_artifact(self, artifact):
-        if len(self.artifacts) == self.length:
-            self.artifacts = self.artifacts[:-1]
-        self.artifacts.insert(0, artifact)
+        self.artifacts.appendleft(artifact)
 
     def learn(self, artifact):
         """Learn new artifact. Removes last artifact from the memory if it is
@@ -729,7 +718,7 @@ class STMemory():
         if len(self.artifacts) == 0:
             return np.random.random()*mdist
         for a in self.artifacts:
-            d = np.sqrt(np.sum(np.square(a - artifact)))
+            d = np.linalg.norm(a - artifact)
             if d < mdist:
                 mdist = d
         return mdist
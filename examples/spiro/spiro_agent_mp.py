@@ -39,7 +39,12 @@ from creamas.vote import VoteAgent,VoteManager, VoteEnvironment, VoteOrganizer,
 from creamas.logging import ObjectLogger
 from creamas.util import run, create_tasks
 
-from spiro import give_dots, give_dots_yield, spiro_image
+from spiro import box_downsample, spiro_canvas, spiro_canvases
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 TIMEOUT = 5
 
@@ -116,12 +121,20 @@ class SpiroAgent(VoteAgent):
         super().__init__(environment, log_folder=log_folder,
                          log_level=log_level)
         self.name = "{}_N{}".format(self.name, desired_novelty)
-        self.spiro_args = np.random.uniform(-199, 199, [2,])
+        self._rng = np.random.default_rng()
+        self.spiro_args = self._rng.uniform(-199, 199, [2,])
         # How many spirographs are generated to find the best one per iteration.
         self.search_width = search_width
         self.teaching_iterations = 1
         self.img_size = img_size
         self.desired_novelty = desired_novelty
+        # Hedonic value is normalized by the pdf's value at its peak.
+        self._lmax = None
+        if desired_novelty > 0:
+            self._lmax = gaus_pdf(desired_novelty, desired_novelty, 4)
+            self._eval_fn = self._eval_hedonic
+        else:
+            self._eval_fn = self._eval_novelty
         #init_func = functools.partial(np.random.normal, 0.9, 0.4)
         #self.stmem = ImageSOM(6, 6, self.img_size**2, init_func, coef=0.01)
         self.stmem = STMemory(length=memsize)
@@ -139,32 +152,39 @@ class SpiroAgent(VoteAgent):
 
     def create(self, r, r_, R=200):
         """Create new spirograph image with given arguments. Returned image is
-        scaled to agent's preferred image size.
+        scaled to agent's preferred image size and has float32 pixel values in
+        [0, 1].
+        """
+        img = spiro_canvas(R, r, r_, spins=20)
+        return box_downsample(img, [self.img_size, self.img_size])
+
+    def create_many(self, all_args, R=200):
+        """Create a spirograph image for each (r, r_) row in *all_args* as
+        in :meth:`create`.
+
+        If numba is available, the images are drawn in parallel.
+
+        :returns: float32 array of shape (len(all_args), img_size, img_size).
         """
-        x, y = give_dots(R, r, r_, spins=20)
-        xy = np.array([x, y]).T
-        xy = np.array(np.around(xy), dtype=np.int64)
-        xy = xy[(xy[:, 0] >= -250) & (xy[:, 1] >= -250) &
-                (xy[:, 0] < 250) & (xy[:, 1] < 250)]
-        xy = xy + 250
-        img = np.ones([500, 500], dtype=np.uint8)
-        img[:] = 255
-        img[xy[:, 0], xy[:, 1]] = 0
-        img = misc.imresize(img, [self.img_size, self.img_size])
-        fimg = img / 255.0
-        return fimg
-
-    def randomize_args(self):
+        imgs = spiro_canvases(R, all_args, spins=20)
+        return box_downsample(imgs, [self.img_size, self.img_size])
+
+    def randomize_args(self, n=None):
         """Get new parameters for spirograph generation near agent's current
         location (*spiro_args*).
+
+        :param int n:
+            Optional. If given, returns an array of *n* new parameter pairs,
+            one pair per row.
         """
-        args = self.spiro_args + np.random.normal(0, self.move_radius,
-                                                  self.spiro_args.shape)
-        np.clip(args, -199, 199, args)
-        while args[0] == 0 or args[1] == 0:
-            args = self.spiro_args + np.random.normal(0, self.move_radius,
-                                                      self.spiro_args.shape)
-            np.clip(args, -199, 199, args)
+        shape = self.spiro_args.shape
+        if n is not None:
+            shape = (n,) + shape
+        args = (self.spiro_args +
+                self._rng.standard_normal(shape) * self.move_radius)
+        np.clip(args, -199, 199, out=args)
+        # Spirograph radii can not be zero.
+        args[args == 0] = 1e-6
         return args
 
     def hedonic_value(self, novelty):
@@ -172,25 +192,52 @@ class SpiroAgent(VoteAgent):
 
         Not used if *desired_novelty*=-1
         """
-        lmax = gaus_pdf(self.desired_novelty, self.desired_novelty, 4)
         pdf = gaus_pdf(novelty, self.desired_novelty, 4)
-        return pdf / lmax
+        return pdf / self._lmax
 
-    def novelty(self, img):
+    def novelty(self, img, early_stop=None):
         """Image's distance to the agent's short-term memory. Usually distance
         to the closest object/prototypical object model in the memory.
+
+        See :meth:`STMemory.distance` for *early_stop*.
         """
-        dist = self.stmem.distance(img.flatten())
+        dist = self.stmem.distance(img.reshape(-1), early_stop=early_stop)
         return dist
 
-    def evaluate(self, artifact):
+    def evaluate(self, artifact, threshold=None):
         """Evaluate the artifact with respect to the agents short term memory.
 
         Returns value in [0, 1].
+
+        If *threshold* is given and the agent is maximizing novelty, the
+        evaluation may stop as soon as it is known to be below *threshold*. The
+        returned value is then below *threshold*, but not necessarily exact.
         """
-        if self.desired_novelty > 0:
-            return self.hedonic_value(self.novelty(artifact.obj))
-        return self.novelty(artifact.obj) / self.img_size, None
+        return self._eval_fn(artifact, threshold)
+
+    def _eval_hedonic(self, artifact, threshold=None):
+        return self.hedonic_value(self.novelty(artifact.obj)), None
+
+    def _eval_novelty(self, artifact, threshold=None):
+        early_stop = None
+        if threshold is not None:
+            early_stop = threshold * self.img_size
+        return self.novelty(artifact.obj, early_stop) / self.img_size, None
+
+    def evaluate_images(self, imgs):
+        """Evaluate a batch of images in the same way as :meth:`evaluate`
+        evaluates a single artifact.
+
+        The images' distances to the short term memory are computed all at
+        once.
+
+        :returns: An array of evaluations, one for each image.
+        """
+        X = np.stack([img.reshape(-1) for img in imgs])
+        novelties = self.stmem.distances(X)
+        if self._lmax is not None:
+            return self.hedonic_value(novelties)
+        return novelties / self.img_size
 
     def invent(self, n):
         """Invent new spirograph by taking n random steps from current position
@@ -201,19 +248,13 @@ class SpiroAgent(VoteAgent):
         :returns: Best created artifact.
         :rtype: :py:class:`~creamas.core.agent.Artifact`
         """
-        args = self.randomize_args()
-        img = self.create(args[0], args[1])
-        best_artifact = SpiroArtifact(self, img, domain='image')
-        ev, _ = self.evaluate(best_artifact)
-        best_artifact.add_eval(self, ev, fr={'args': args})
-        for i in range(n-1):
-            args = self.randomize_args()
-            img = self.create(args[0], args[1])
-            artifact = SpiroArtifact(self, img, domain='image')
-            ev, _ = self.evaluate(artifact)
-            artifact.add_eval(self, ev, fr={'args': args})
-            if ev > best_artifact.evals[self.name]:
-                best_artifact = artifact
+        all_args = self.randomize_args(n)
+        imgs = self.create_many(all_args)
+        evs = self.evaluate_images(imgs)
+        best = int(np.argmax(evs))
+        best_artifact = SpiroArtifact(self, imgs[best].copy(), domain='image')
+        best_artifact.add_eval(self, float(evs[best]),
+                               fr={'args': all_args[best].copy()})
         self.spiro_args = best_artifact.framings[self.name]['args']
         best_artifact.in_domain = False
         best_artifact.self_criticism = 'reject'
@@ -235,8 +276,8 @@ class SpiroAgent(VoteAgent):
         artifact = self.invent(self.search_width)
         args = artifact.framings[self.name]['args']
         val = artifact.evals[self.name]
-        self._log(logging.DEBUG, "Created spirograph with args={}, val={}"
-                  .format(args, val))
+        self._log(logging.DEBUG, "Created spirograph with args=%s, val=%s",
+                  args, val)
         self.spiro_args = args
         self.arg_history.append(self.spiro_args)
         self.add_artifact(artifact)
@@ -250,10 +291,10 @@ class SpiroAgent(VoteAgent):
             self.added_last = True
         elif self.jump == 'random':
             largs = self.spiro_args
-            self.spiro_args = np.random.uniform(-199, 199,
+            self.spiro_args = self._rng.uniform(-199, 199,
                                                 self.spiro_args.shape)
-            self._log(logging.DEBUG, "Jumped from {} to {}"
-                      .format(largs, self.spiro_args))
+            self._log(logging.DEBUG, "Jumped from %s to %s", largs,
+                      self.spiro_args)
         self.save_images(artifact)
 
     async def learn_from_domain(self, method='random', amount=10):
@@ -275,19 +316,17 @@ class SpiroAgent(VoteAgent):
             return
         if 'random' in method:
             samples = min(len(arts), amount)
-            ars = np.random.choice(arts, samples, replace=False)
-            for a in ars:
-                self.learn(a, self.teaching_iterations)
+            for i in np.random.choice(len(arts), samples, replace=False):
+                self.learn(arts[i], self.teaching_iterations)
         if 'closest' in method:
-            ars = arts
-            dists = []
-            for a in ars:
-                args = a.framings[a.creator]['args']
-                d = np.sqrt(np.sum(np.square(args - self.spiro_args)))
-                dists.append((d,a))
-            dists.sort(key=operator.itemgetter(0))
-            for d,a in dists[:amount]:
-                self.learn(a, self.teaching_iterations)
+            k = min(len(arts), amount)
+            if k <= 0:
+                return
+            diffs = np.array([a.framings[a.creator]['args'] for a in arts]) - self.spiro_args
+            d2 = np.einsum('ij,ij->i', diffs, diffs)
+            closest = np.argpartition(d2, k - 1)[:k]
+            for i in closest[np.argsort(d2[closest])]:
+                self.learn(arts[i], self.teaching_iterations)
 
     def learn(self, spiro, iterations=1):
         """Train short term memory with given spirograph.
@@ -296,7 +335,7 @@ class SpiroAgent(VoteAgent):
             :py:class:`SpiroArtifact` object
         """
         for i in range(iterations):
-            self.stmem.train_cycle(spiro.obj.flatten())
+            self.stmem.train_cycle(spiro.flat_view)
 
     @aiomas.expose
     async def domain_artifact_added(self, spiro, iterations=1):
@@ -315,7 +354,7 @@ class SpiroAgent(VoteAgent):
         valid = []
         for c in candidates:
             if c.creator != self.name:
-                ceval, _ = self.evaluate(c)
+                ceval, _ = self.evaluate(c, self._novelty_threshold)
                 if ceval >= self._novelty_threshold:
                     valid.append(c)
                     if ceval > besteval:
@@ -327,8 +366,8 @@ class SpiroAgent(VoteAgent):
             if bestcand is not None and not self.added_last:
                 largs = self.spiro_args
                 self.spiro_args = bestcand.framings[bestcand.creator]['args']
-                self._log(logging.INFO,
-                          "Jumped from {} to {}".format(largs, self.spiro_args))
+                self._log(logging.INFO, "Jumped from %s to %s", largs,
+                          self.spiro_args)
         return valid
 
     def save_images(self, artifact):
@@ -347,19 +386,8 @@ class SpiroAgent(VoteAgent):
     def _artifact_distances(self):
         accepted = [a for a in self.A if a.self_criticism == 'pass']
         accepted = sorted(accepted, key=lambda x: x.creation_time)
-        distances = []
-        indeces = []
-        for i,a1 in enumerate(accepted[1:]):
-            spiro1 = a1.obj
-            j = i+1
-            mdist = np.sqrt(spiro1.flatten().shape[0])
-            for a2 in accepted[:j]:
-                spiro2 = a2.obj
-                dist = np.sqrt(np.sum(np.square(spiro1.flatten() - spiro2.flatten())))
-                if dist < mdist:
-                    mdist = dist
-            distances.append(mdist)
-            indeces.append(i)
+        distances = list(min_preceding_distances([a.obj for a in accepted]))
+        indeces = list(range(len(distances)))
         mean_dist = np.mean(distances)
         return mean_dist, distances, indeces
 
@@ -449,7 +477,7 @@ class SpiroAgent(VoteAgent):
         mean_dist, dists, indeces = self._artifact_distances()
         if len(dists) == 0:
             mean_dist = 0.0
-        self._log(logging.INFO, "Mean of distances: {}".format(mean_dist))
+        self._log(logging.INFO, "Mean of distances: %s", mean_dist)
         #self.plot_distances(mean_dist, dists, indeces)
         #self.plot_places()
         return mean_dist
@@ -458,6 +486,12 @@ class SpiroAgent(VoteAgent):
 class SpiroArtifact(Artifact):
     """Artifact class for Spirographs.
     """
+    @property
+    def flat_view(self):
+        """The spirograph image as a one-dimensional view (not a copy).
+        """
+        return self.obj.reshape(-1)
+
     def __str__(self):
         return "Spirograph by: {} {}".format(self.creator,
                                             self.framings[self.creator])
@@ -502,6 +536,13 @@ class SpiroMultiEnvironment(MultiEnvironment):
         self.save_image_number = 1
         self.img_size = 32
         self.age = 0
+        # Number of environment artifacts per creator
+        self._creator_counter = Counter()
+        # Flattened environment artifact images as rows in the order they
+        # were added, and their env times. The matrix grows by doubling its
+        # capacity.
+        self._art_stack = None
+        self._art_times = np.zeros(0)
         self.voting_method = vote_mean
         self.valid_cand = []
         self.suggested_cand = []
@@ -514,6 +555,28 @@ class SpiroMultiEnvironment(MultiEnvironment):
         ret = await self.manager.domain_artifact_added(manager_addr, artifact)
         return ret
 
+    def add_artifact(self, artifact):
+        super().add_artifact(artifact)
+        self._creator_counter[artifact.creator] += 1
+        self._add_art_row(artifact)
+
+    def _add_art_row(self, artifact):
+        """Append the flattened image of the last added artifact to the
+        artifact matrix.
+        """
+        i = len(self.artifacts) - 1
+        row = artifact.obj.reshape(-1)
+        if self._art_stack is None:
+            self._art_stack = np.empty((16, row.shape[0]), dtype=np.float32)
+            self._art_times = np.empty(16)
+        elif i == self._art_stack.shape[0]:
+            stack = np.empty((2 * i, row.shape[0]), dtype=np.float32)
+            stack[:i] = self._art_stack
+            self._art_stack = stack
+            self._art_times = np.resize(self._art_times, 2 * i)
+        self._art_stack[i] = row
+        self._art_times[i] = artifact.env_time
+
     def vote_and_save_info(self, age):
         self.age = age
         self.vote_organizer.gather_candidates()
@@ -530,7 +593,7 @@ class SpiroMultiEnvironment(MultiEnvironment):
             self.add_artifact(a)
             tasks = []
             for addr in self._manager_addrs:
-                tasks.append(asyncio.ensure_future(self._add_domain_artifact(addr, a)))
+                tasks.append(self._add_domain_artifact(addr, a))
             aiomas.run(until=asyncio.gather(*tasks))
 
         self.vote_organizer.clear_candidates(clear_env=True)
@@ -541,18 +604,14 @@ class SpiroMultiEnvironment(MultiEnvironment):
         accepted_y = []
         rejected_x = []
         rejected_y = []
-        sort_arts = sorted(self.artifacts, key=lambda x: x.env_time)
-
-        distances = []
-        for i,a1 in enumerate(sort_arts[1:]):
-            spiro1 = a1.obj
-            i = i+1
-            mdist = np.sqrt(spiro1.flatten().shape[0])
-            for a2 in sort_arts[:i]:
-                spiro2 = a2.obj
-                dist = np.sqrt(np.sum(np.square(spiro1.flatten() - spiro2.flatten())))
-                if dist < mdist:
-                    mdist = dist
+        n = len(self.artifacts)
+        order = np.argsort(self._art_times[:n], kind='stable')
+        sort_arts = [self.artifacts[i] for i in order]
+
+        distances = np.zeros(0)
+        if n > 1:
+            distances = _min_preceding_row_distances(self._art_stack[order])
+        for a1, mdist in zip(sort_arts[1:], distances):
             if a1.accepted:
                 accepted_x.append(a1.env_time)
                 accepted_y.append(mdist)
@@ -578,7 +637,7 @@ class SpiroMultiEnvironment(MultiEnvironment):
 
     def plot_creators(self):
         from matplotlib import pyplot as plt
-        counter = Counter([a.creator for a in self.artifacts])
+        counter = self._creator_counter
         ticks = np.arange(len(counter.values()))
         c = list(counter.items())
         c.sort(key=operator.itemgetter(0))
@@ -715,17 +774,104 @@ class SpiroMultiEnvironment(MultiEnvironment):
         return ret
 
 
+def _min_sq_distance(M, q, early_stop_sq):
+    """Smallest squared Euclidean distance from *q* to the rows of *M*.
+
+    The sum for a row is abandoned as soon as it exceeds the smallest distance
+    found so far, and the scan stops as soon as a distance below
+    *early_stop_sq* is found.
+    """
+    best = np.inf
+    for i in range(M.shape[0]):
+        s = 0.0
+        for k in range(M.shape[1]):
+            d = M[i, k] - q[k]
+            s += d * d
+            if s >= best:
+                break
+        if s < best:
+            best = s
+            if best < early_stop_sq:
+                break
+    return best
+
+
+if njit is not None:
+    _min_sq_distance = njit(cache=True)(_min_sq_distance)
+
+
+def min_preceding_distances(imgs):
+    """Compute for each image, except the first one, the minimum Euclidean
+    distance to the images preceding it in *imgs*.
+
+    The closest preceding image of each image is found from all the pairwise
+    distances, which are computed at once from the float64 Gram matrix of the
+    flattened images. The distances to the closest images are then computed
+    exactly, as the squared distances from the Gram matrix suffer from
+    cancellation, e.g. the distance between two identical images is not zero.
+    The distances are capped to the square root of the number of pixels.
+
+    :returns: An array of ``len(imgs) - 1`` distances.
+    """
+    if len(imgs) < 2:
+        return np.zeros(0)
+    X = np.stack([img.reshape(-1) for img in imgs])
+    return _min_preceding_row_distances(X)
+
+
+def _min_preceding_row_distances(X):
+    """:func:`min_preceding_distances` for the rows of *X*.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    sq = np.einsum('ij,ij->i', X, X)
+    D2 = sq[:, None] + sq[None, :] - 2 * (X @ X.T)
+    D2[np.triu_indices(len(X))] = np.inf
+    closest = D2[1:].argmin(axis=1)
+    dists = np.linalg.norm(X[1:] - X[closest], axis=1)
+    return np.minimum(dists, np.sqrt(X.shape[1]))
+
+
 class STMemory():
-    """Agent's short-term memory model using a simple list which stores
-    artifacts as is."""
+    """Agent's short-term memory model which stores artifacts as is.
+
+    The memorized artifacts are kept as rows of a single contiguous float32
+    matrix, which is used as a ring buffer. The matrix is allocated when the
+    first artifact is learned. The squared norms of the rows are cached so
+    that the distances can be computed from the rows' dot products.
+    """
     def __init__(self, length):
         self.length = length
-        self.artifacts = []
+        self._buf = None
+        self._sq = np.zeros(length, dtype=np.float32)
+        self._head = 0
+        self._count = 0
+
+    @property
+    def artifacts(self):
+        """Memorized artifacts as rows of a matrix (in no particular order).
+        """
+        if self._buf is None:
+            return np.empty((0, 0), dtype=np.float32)
+        return self._buf[:self._count]
 
     def _add_artifact(self, artifact):
-        if len(self.artifacts) == self.length:
-            self.artifacts = self.artifacts[:-1]
-        self.artifacts.insert(0, artifact)
+        """Write *artifact* to the row at :attr:`_head` and advance the head.
+
+        The first :attr:`_count` rows of the buffer hold the memorized
+        artifacts. Once the memory is full, the head points to the oldest
+        artifact, which is overwritten next. The order of the rows does not
+        matter for the distances, so adding an artifact never moves the other
+        rows.
+        """
+        if self._buf is None:
+            self._buf = np.empty((self.length, artifact.shape[0]),
+                                 dtype=np.float32)
+        row = self._buf[self._head]
+        row[:] = artifact
+        self._sq[self._head] = row @ row
+        self._head = (self._head + 1) % self.length
+        if self._count < self.length:
+            self._count += 1
 
     def learn(self, artifact):
         """Learn new artifact. Removes last artifact from the memory if it is
@@ -738,15 +884,41 @@ class STMemory():
         """
         self.learn(artifact)
 
-    def distance(self, artifact):
+    def distances(self, artifacts):
+        """Distances of each row of *artifacts* to the closest memorized
+        artifact.
+
+        The squared distances to all memorized artifacts are computed with a
+        single matrix product.
+        """
+        mdist = np.sqrt(artifacts.shape[1])
+        if self._count == 0:
+            return np.random.random(artifacts.shape[0])*mdist
+        M = self._buf[:self._count]
+        D2 = (np.einsum('ij,ij->i', artifacts, artifacts)[:, None] +
+              self._sq[None, :self._count] - 2 * (artifacts @ M.T))
+        dists = np.sqrt(np.maximum(D2.min(axis=1), 0.0))
+        return np.minimum(dists, mdist)
+
+    def distance(self, artifact, early_stop=None):
+        """Distance of *artifact* to the closest memorized artifact.
+
+        If *early_stop* is given and numba is available, the memorized
+        artifacts are scanned one by one and the scan stops as soon as an
+        artifact closer than *early_stop* is found. The returned distance is
+        then below *early_stop*, but not necessarily the smallest one.
+        """
         mdist = np.sqrt(artifact.shape[0])
-        if len(self.artifacts) == 0:
+        if self._count == 0:
             return np.random.random()*mdist
-        for a in self.artifacts:
-            d = np.sqrt(np.sum(np.square(a - artifact)))
-            if d < mdist:
-                mdist = d
-        return mdist
+        q = artifact.astype(np.float32, copy=False)
+        if early_stop is not None and njit is not None:
+            d2 = _min_sq_distance(self._buf[:self._count], q, early_stop**2)
+        else:
+            d2 = (self._sq[:self._count] - 2 * (self._buf[:self._count] @ q) +
+                  q @ q).min()
+        d = np.sqrt(max(d2, 0.0))
+        return min(d, mdist)
 
 
 if __name__ == "__main__":
@@ -785,11 +957,10 @@ if __name__ == "__main__":
     ret = run(menv.set_host_managers())
     ret = run(menv.is_ready())
     print(ret)
-    for _ in range(64):
-        ret = aiomas.run(until=menv.spawn('spiro_agent_mp:SpiroAgent',
-                                          desired_novelty=-1,
-                                          log_folder=log_folder))
-        # print(ret)
+    specs = [('spiro_agent_mp:SpiroAgent', [],
+              {'desired_novelty': -1, 'log_folder': log_folder})
+             for _ in range(64)]
+    ret = aiomas.run(until=menv.spawn_many(specs))
 
     sim = Simulation(menv, log_folder=log_folder,
                      callback=menv.vote_and_save_info)
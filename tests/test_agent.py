@@ -87,6 +87,15 @@ class AgentTestCase(unittest.TestCase):
         a1.add_connections([(b.addr, {'foo': 'bar'}) for b in b_agents])
         self.assertEqual(len(a1.connections.keys()), 5)
 
+        # Best connections are ranked by the given key in their data
+        a1.add_connection(a_agents[1].addr, attitude=0.5)
+        a1.add_connection(a2.addr, attitude=0.9)
+        self.assertEqual([a2.addr], a1.best_connections())
+        self.assertEqual([a2.addr, a_agents[1].addr], a1.best_connections(k=5))
+        self.assertEqual([], a1.best_connections(key='baz'))
+        a1.remove_connection(a_agents[1].addr)
+        a1.remove_connection(a2.addr)
+
         # Removing non-existing connection returns false
         self.assertFalse(a1.remove_connection(a_agents[1].addr))
 
@@ -94,6 +103,9 @@ class AgentTestCase(unittest.TestCase):
         ret = self.loop.run_until_complete(a1.random_connection())
         self.assertTrue(type(ret), aiomas.rpc.Proxy)
 
+        rets = self.loop.run_until_complete(a1.random_connections(3))
+        self.assertEqual(3, len(rets))
+
         # connect shortcut works and returns a Proxy
         ret = self.loop.run_until_complete(a1.connect(list(a1.connections.keys())[0]))
         self.assertTrue(type(ret), aiomas.rpc.Proxy)
@@ -140,4 +152,12 @@ class AgentTestCase(unittest.TestCase):
         self.assertIn(art, arts)
 
         with self.assertRaises(TypeError):
-            a1.add_artifact(1)
\ No newline at end of file
+            a1.add_artifact(1)
+
+        # Asking several opinions returns them in the order of addresses.
+        rets = self.loop.run_until_complete(a1.ask_opinions([a2.addr, b_agents[0].addr], 1))
+        self.assertEqual(2, len(rets))
+        for r in rets:
+            self.assertEqual(0.0, r[0])
+        # Agents in the same environment are asked directly.
+        self.assertNotIn(a2.addr, a1._proxies)
\ No newline at end of file
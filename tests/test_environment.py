@@ -163,6 +163,13 @@ class TestEnvironment(unittest.TestCase):
         env_arts = self.loop.run_until_complete(e)
         for a in arts:
             self.assertIn(a, env_arts)
+        e = self.env.get_artifacts(agents[1])
+        self.assertEqual(self.loop.run_until_complete(e), [])
+        more = [Artifact(agents[1], i) for i in range(3)]
+        self.env.add_artifacts(iter(more))
+        self.assertEqual(self.env.artifacts[-3:], more)
+        e = self.env.get_artifacts(agents[1])
+        self.assertEqual(self.loop.run_until_complete(e), more)
 
         # Close should shutdown aiomas.Container -> no _tcp_server anymore
         self.env.close()
@@ -3,6 +3,7 @@
 
 Tests for logging module.
 """
+import logging
 import unittest
 
 from testfixtures import TempDirectory
@@ -53,3 +54,12 @@ class LoggingTestCase(unittest.TestCase):
         with open(dum.logger.get_file('baz')) as f:
             msg = f.read()
         self.assertEqual(msg, 'f\to\to\n')
+
+        # Messages with arguments are formatted only when they are emitted,
+        # so the mismatched DEBUG message is neither formatted nor written.
+        with self.assertLogs(dum.logger.logger, level=logging.INFO) as cm:
+            dum.logger.log(logging.DEBUG, "%d", 'not formatted')
+            dum.logger.log(logging.INFO, "%s", 'formatted')
+        self.assertEqual(len(cm.records), 1)
+        self.assertEqual(cm.records[0].levelno, logging.INFO)
+        self.assertEqual(cm.records[0].getMessage(), 'dummy: formatted')
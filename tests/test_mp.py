@@ -5,13 +5,19 @@
 Tests for creamas.mp-module.
 """
 import asyncio
+import multiprocessing
+import os
+import tempfile
+import time
 import unittest
 
 import aiomas
 
 from creamas.core.agent import CreativeAgent
+from creamas.core.artifact import Artifact
 from creamas.core.environment import Environment
-from creamas.mp import MultiEnvironment, EnvManager, MultiEnvManager
+from creamas.mp import MultiEnvironment, EnvManager, MultiEnvManager, \
+    pin_processes
 from creamas.util import run, split_addrs
 
 
@@ -41,6 +47,14 @@ class MenvTestCase(unittest.TestCase):
         n_agents = 40
 
         self.assertEqual(self.menv.artifacts, [])
+        self.menv.age = 3
+        arts = [Artifact(name, i) for i, name in enumerate('aba')]
+        self.menv.add_artifacts(arts)
+        self.assertEqual(self.menv.artifacts, arts)
+        self.assertEqual([a.env_time for a in arts], [3, 3, 3])
+        self.assertEqual(self.menv.get_artifacts('a'), [arts[0], arts[2]])
+        self.menv.add_artifact(Artifact('b', 3))
+        self.assertEqual(len(self.menv.get_artifacts('b')), 2)
         ready = run(self.menv.is_ready())
         self.assertEqual(ready, True)
 
@@ -83,12 +97,62 @@ class MenvTestCase(unittest.TestCase):
         agents = self.menv.get_agents(addr=True)
         self.assertEqual(len(agents), n_agents + n_agents2)
 
+        # Test that spawn_many divides the agents to the smaller slave
+        # environment first and returns them in the order of the specs.
+        n_agents3 = 4
+        specs = [('test_mp:MenvTestAgent', [], {}) for _ in range(n_agents3)]
+        ret = run(self.menv.spawn_many(specs))
+        self.assertEqual(len(ret), n_agents3)
+        n_total = n_agents + n_agents2 + n_agents3
+        agents = self.menv.get_agents(addr=True)
+        self.assertEqual(len(agents), n_total)
+        sizes = [len(addrs) for values in split_addrs(agents).values()
+                 for addrs in values.values()]
+        self.assertEqual(sorted(sizes), [24, 30])
+
+        # Test that a slave manager's spawn_n creates distinct agents of the
+        # given class.
+        async def slave_spawn_n(addr, n):
+            r_manager = await self.menv.connect(addr)
+            rets = await r_manager.spawn_n('test_mp:MenvTestAgent', n)
+            return [r[1] for r in rets]
+
+        slave_addrs = run(slave_spawn_n(managers[0], 3))
+        self.assertEqual(len(set(slave_addrs)), 3)
+        for a in slave_addrs:
+            self.assertTrue(a.startswith(managers[0][:-1]))
+        n_total += 3
+
+        # Test that the agent addresses are cached until invalidated.
+        self.assertEqual(len(self.menv.get_agents(addr=True)), n_total - 3)
+        self.menv.invalidate_agents_cache()
+        self.assertEqual(len(self.menv.get_agents(addr=True)), n_total)
+
+        # Test that spawn_n_all spawns the agents to each slave environment.
+        ret = run(self.menv.spawn_n_all('test_mp:MenvTestAgent', 2))
+        self.assertEqual(len(ret), 4)
+        self.assertEqual(len(split_addrs([r[1] for r in ret])['localhost']),
+                         2)
+        n_total += 4
+
         # Test that trigger all passes args and kwargs down to all agents and
         # returns a value for each agent in the environment.
         args = ['plop', 10]
         kwargs = {'foo': 'bar', 'yep': 2}
         ret = run(self.menv.trigger_all(*args, **kwargs))
-        self.assertEqual(len(ret), n_agents + n_agents2)
+        self.assertEqual(len(ret), n_total)
+        for r in ret:
+            c_args, c_kwargs = r
+            self.assertEqual(args, c_args)
+            self.assertEqual(kwargs, c_kwargs)
+
+        # Test that trigger act triggers the agent through its manager.
+        ret = run(self.menv.trigger_act(agents[0]))
+        self.assertEqual(ret, [[], {}])
+
+        # Test that trigger acts triggers only the given agents.
+        ret = run(self.menv.trigger_acts(agents[:5], *args, **kwargs))
+        self.assertEqual(len(ret), 5)
         for r in ret:
             c_args, c_kwargs = r
             self.assertEqual(args, c_args)
@@ -98,8 +162,84 @@ class MenvTestCase(unittest.TestCase):
         # multi-environments
         import networkx
         from creamas.nx import connections_from_graph, graph_from_connections
-        G = networkx.fast_gnp_random_graph(n_agents + n_agents2, 0.4)
+        G = networkx.fast_gnp_random_graph(n_total, 0.4)
         connections_from_graph(self.menv, G)
         G2 = graph_from_connections(self.menv, False)
-        self.assertEqual(len(G2), n_agents+n_agents2)
+        self.assertEqual(len(G2), n_total)
         self.assertTrue(networkx.is_isomorphic(G, G2))
+
+
+class UnixSocketMenvTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.paths = [os.path.join(self.tmpdir.name, 's{}.sock'.format(i))
+                      for i in range(2)]
+        self.menv = MultiEnvironment(('localhost', 5555),
+                                     env_cls=Environment,
+                                     mgr_cls=MultiEnvManager)
+        # Close the multi-environment even if setUp or the test fails
+        # before the test closes it.
+        self.closed = False
+        self.addCleanup(self.close_menv)
+        run(self.menv.spawn_slaves(slave_addrs=self.paths,
+                                   slave_env_cls=Environment,
+                                   slave_mgr_cls=EnvManager))
+        run(self.menv.wait_slaves(5, check_ready=True))
+
+    def close_menv(self):
+        if not self.closed:
+            self.closed = True
+            self.menv.close()
+
+    def test_unix_sockets(self):
+        for addr in self.menv.addrs:
+            self.assertTrue(addr.startswith('ipc://'))
+        run(self.menv.spawn_n('test_mp:MenvTestAgent', 4))
+        ret = run(self.menv.trigger_all('plop'))
+        self.assertEqual(len(ret), 4)
+        for c_args, c_kwargs in ret:
+            self.assertEqual(c_args, ['plop'])
+        self.close_menv()
+        for path in self.paths:
+            self.assertFalse(os.path.exists(path))
+
+
+class ForkserverMenvTestCase(unittest.TestCase):
+
+    def test_forkserver(self):
+        ctx = multiprocessing.get_context('forkserver')
+        menv = MultiEnvironment(('localhost', 5555), env_cls=Environment,
+                                mgr_cls=MultiEnvManager)
+        run(menv.spawn_slaves(slave_addrs=[('localhost', 5556),
+                                           ('localhost', 5557)],
+                              slave_env_cls=Environment,
+                              slave_mgr_cls=EnvManager, mp_context=ctx))
+        try:
+            run(menv.wait_slaves(10, check_ready=True))
+            run(menv.spawn_n('test_mp:MenvTestAgent', 2))
+            self.assertEqual(len(menv.get_agents()), 2)
+        finally:
+            menv.close()
+
+
+class PinProcessesTestCase(unittest.TestCase):
+
+    @unittest.skipUnless(hasattr(os, 'sched_setaffinity'),
+                         "CPU affinity is not supported on this platform")
+    def test_pin_processes(self):
+        procs = [multiprocessing.Process(target=time.sleep, args=(5,),
+                                         daemon=True) for _ in range(3)]
+        for p in procs:
+            p.start()
+        try:
+            cpus = sorted(os.sched_getaffinity(0))
+            assigned = pin_processes(procs)
+            self.assertEqual(assigned, [cpus[i % len(cpus)] for i in range(3)])
+            for p, cpu in zip(procs, assigned):
+                self.assertEqual(os.sched_getaffinity(p.pid), {cpu})
+        finally:
+            for p in procs:
+                p.terminate()
+                p.join()
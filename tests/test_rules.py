@@ -7,15 +7,34 @@ Tests for rules-package
 import asyncio
 import unittest
 
+import numpy as np
+
 from creamas.rules.feature import Feature
 from creamas.rules.mapper import Mapper
 
 from creamas.core.agent import CreativeAgent
+from creamas.core.artifact import Artifact
 from creamas.core.environment import Environment
 from creamas.rules.rule import RuleLeaf, Rule
 from creamas.rules.agent import RuleAgent
 
 
+class ObjFeature(Feature):
+
+    def extract(self, artifact, **kwargs):
+        return artifact.obj
+
+
+class ElemFeature(Feature):
+
+    def extract(self, artifact, **kwargs):
+        return float(artifact.obj[1000])
+
+
+class ResourceRuleAgent(RuleAgent):
+    eval_respects_resources = True
+
+
 class RulesTestCase(unittest.TestCase):
 
     def setUp(self):
@@ -67,3 +86,70 @@ class RulesTestCase(unittest.TestCase):
         self.assertEqual(1, len(a1.W))
         self.assertEqual(a1.get_weight(rule2), 1.0)
         self.assertFalse(a1.remove_rule(rule))
+
+    def test_evaluate(self):
+        a1 = RuleAgent(self.env)
+        art = Artifact(a1, 0.5, domain=float)
+        self.assertEqual(a1.evaluate(art), (0.0, None))
+
+        feats = [ObjFeature('feat{}'.format(i), {float}, float) for i in range(6)]
+        rules = [RuleLeaf(f, Mapper()) for f in feats]
+        a1.add_rule(rules[0], 1.0)
+        a1.add_rule(rules[1], -0.5)
+        self.assertAlmostEqual(a1.evaluate(art)[0], 0.25 / 1.5)
+
+        # Evaluation with more rules gives the same results.
+        weights = [1.0, -0.5, 0.25, 0.0, -1.0, 0.5]
+        for rule, w in zip(rules, weights):
+            a1.set_weight(rule, w)
+        e = sum(w * 0.5 for w in weights) / sum(abs(w) for w in weights)
+        self.assertAlmostEqual(a1.evaluate(art)[0], e)
+
+        # Early-out evaluation drops the rules with the smallest weights.
+        e = sum(w * 0.5 for w in weights if abs(w) > 0.25) / sum(abs(w) for w in weights)
+        self.assertAlmostEqual(a1.evaluate(art, eps=0.1)[0], e)
+        self.assertAlmostEqual(a1.evaluate(art, eps=0.0)[0], a1.evaluate(art)[0])
+
+        for rule in rules:
+            a1.set_weight(rule, 0.0)
+        self.assertEqual(a1.evaluate(art), (0.0, None))
+
+        # Evaluations are not memoized by default.
+        a1.set_weight(rules[0], 1.0)
+        self.assertEqual(a1.evaluate(art), (0.5, None))
+        self.assertNotIn(id(art), a1._eval_cache)
+
+        # When enabled, evaluations are memoized until the weights change.
+        a1.eval_cache_size = 16
+        self.assertEqual(a1.evaluate(art), (0.5, None))
+        self.assertIn(id(art), a1._eval_cache)
+        a1.set_weight(rules[0], 0.5)
+        self.assertNotIn(id(art), a1._eval_cache)
+        self.assertEqual(a1.evaluate(art), (0.5, None))
+        a1.set_weight(rules[1], -0.5)
+        self.assertAlmostEqual(a1.evaluate(art)[0], 0.0)
+
+        # Different artifacts with equal string forms are not mixed up in the
+        # memo.
+        a3 = RuleAgent(self.env)
+        a3.eval_cache_size = 16
+        feat = ElemFeature('elem', {np.ndarray}, float)
+        a3.add_rule(RuleLeaf(feat, Mapper()), 1.0)
+        obj1 = np.zeros(2000)
+        obj2 = np.zeros(2000)
+        obj2[1000] = 1.0
+        art1 = Artifact(a3, obj1, domain=np.ndarray)
+        art2 = Artifact(a3, obj2, domain=np.ndarray)
+        self.assertEqual(str(art1), str(art2))
+        self.assertEqual(a3.evaluate(art1), (0.0, None))
+        self.assertEqual(a3.evaluate(art2), (1.0, None))
+        self.assertEqual(a3.evaluate(art1), (0.0, None))
+
+        # Agents respecting their resources do not evaluate when exhausted.
+        a2 = ResourceRuleAgent(self.env, resources=1)
+        a2.add_rule(rules[0], 1.0)
+        art = Artifact(a1, 0.8, domain=float)
+        a2.cur_res = 0
+        self.assertEqual(a2.evaluate(art), (0.0, None))
+        a2.refill()
+        self.assertAlmostEqual(a2.evaluate(art)[0], 0.8)
@@ -0,0 +1,44 @@
+"""
+.. :py:module:: test_serializers
+    :platform: Unix
+
+Tests for serializers module.
+"""
+import unittest
+
+import numpy as np
+
+from creamas.core.artifact import Artifact
+from creamas.serializers import artifact_serializer, ndarray_serializer
+
+
+class DummyAgent():
+    name = 'foo'
+
+
+class SerializersTestCase(unittest.TestCase):
+
+    def test_ndarray_serializer(self):
+        _, dump, load = ndarray_serializer()
+        for arr in [np.arange(12, dtype=np.float32).reshape(3, 4),
+                    np.arange(12).reshape(3, 4).T,
+                    np.array(['a', 1, None], dtype=object),
+                    np.zeros(3, dtype=[('x', 'f4'), ('y', 'i4')])]:
+            ret = load(dump(arr))
+            self.assertEqual(ret.dtype, arr.dtype)
+            self.assertEqual(ret.shape, arr.shape)
+            self.assertTrue(np.array_equal(ret, arr))
+        # Loaded arrays are writable.
+        ret = load(dump(np.zeros(3)))
+        ret[0] = 1.0
+
+    def test_artifact_serializer(self):
+        _, dump, load = artifact_serializer()
+        art = Artifact(DummyAgent(), 1)
+        self.assertEqual(load(dump(art)), art)
+        # Attributes changed after sending are sent again.
+        art.env_time = 1
+        art.evals['bar'] = 0.1
+        ret = load(dump(art))
+        self.assertEqual(ret.env_time, 1)
+        self.assertEqual(ret.evals, {'bar': 0.1})
@@ -11,10 +11,12 @@ from random import choice, random
 
 import aiomas
 
-from creamas.vote import VoteAgent, VoteEnvironment, VoteOrganizer
+from creamas.vote import VoteAgent, VoteEnvironment, VoteManager, VoteOrganizer
 from creamas.vote import vote_mean, vote_IRV, vote_best, vote_least_worst, vote_random
 from creamas.core.artifact import Artifact
 from creamas.core.environment import Environment
+from creamas.mp import MultiEnvironment, MultiEnvManager
+from creamas.util import run
 from creamas.serializers import artifact_serializer
 
 
@@ -43,6 +45,13 @@ class VoteTestAgent(VoteAgent):
         return valid
 
 
+class CandidateVoteAgent(VoteTestAgent):
+
+    @aiomas.expose
+    async def act(self, *args, **kwargs):
+        self.add_candidate(Artifact(self, self.n))
+
+
 class TestVote(unittest.TestCase):
 
     def setUp(self):
@@ -157,6 +166,36 @@ class TestVote(unittest.TestCase):
         self.vo.gather_votes()
         self.assertEqual(len(self.vo.votes), 0)
 
+    def test_get_managers(self):
+        class MenvStub:
+            def get_slave_managers(self):
+                return ['tcp://localhost:5556/0', 'tcp://localhost:5557/0']
+
+        vo = VoteOrganizer(MenvStub())
+        self.assertEqual(vo.get_managers(), ['tcp://localhost:5556/0',
+                                             'tcp://localhost:5557/0'])
+        self.assertIsNone(self.vo.get_managers())
+
+    def test_vote_IRV(self):
+        # First preferences: a: 2, b: 1, c: 2. Eliminating b moves its vote
+        # to c, which then wins a over 3 to 2.
+        votes = [['a', 'b', 'c'],
+                 ['a', 'c', 'b'],
+                 ['b', 'c', 'a'],
+                 ['c', 'b', 'a'],
+                 ['c', 'a', 'b']]
+        votes = [[(c, 0.0) for c in v] for v in votes]
+        ranking = vote_IRV(['a', 'b', 'c'], votes, 3)
+        self.assertEqual(ranking, [('c', 3), ('a', 2), ('b', 1)])
+        self.assertEqual(vote_IRV(['a', 'b', 'c'], votes, 1), [('c', 3)])
+
+    def test_vote_least_worst(self):
+        # Worst evaluations: a: 0.6, b: 0.5, c: 0.1.
+        votes = [[('a', 0.9), ('b', 0.5), ('c', 0.1)],
+                 [('b', 0.8), ('c', 0.7), ('a', 0.6)]]
+        self.assertEqual(vote_least_worst(['a', 'b', 'c'], votes, 2),
+                         [('a', 0.6), ('b', 0.5)])
+
     def test_vote_methods(self):
         '''Test different predefined voting methods.
         '''
@@ -230,3 +269,64 @@ class TestVote(unittest.TestCase):
         winners = self.vo.compute_results(vote_IRV, winners=2)
         self.assertEqual(len(winners), 2)
         self.vo.clear_candidates(clear_env=True)
+
+
+class TestVoteMenv(unittest.TestCase):
+
+    def setUp(self):
+        codec = aiomas.MsgPack
+        self.menv = MultiEnvironment(('localhost', 5555),
+                                     env_cls=Environment,
+                                     mgr_cls=MultiEnvManager,
+                                     codec=codec)
+        slave_kwargs = [{'codec': codec} for _ in range(2)]
+        run(self.menv.spawn_slaves(slave_addrs=[('localhost', 5556),
+                                                ('localhost', 5557)],
+                                   slave_env_cls=VoteEnvironment,
+                                   slave_mgr_cls=VoteManager,
+                                   slave_kwargs=slave_kwargs))
+        run(self.menv.wait_slaves(5, check_ready=True))
+
+    def tearDown(self):
+        self.menv.close()
+
+    def test_validate_and_gather_votes(self):
+        mgr0, mgr1 = self.menv.addrs
+        for n, mgr in [(0, mgr0), (1, mgr0), (2, mgr1), (4, mgr1)]:
+            run(self.menv.spawn('test_vote:CandidateVoteAgent', n=n,
+                                addr=mgr))
+        run(self.menv.trigger_all())
+
+        vo = VoteOrganizer(self.menv)
+        vo.gather_candidates()
+        self.assertEqual(sorted(c.obj for c in vo.candidates), [0, 1, 2, 4])
+
+        # The first slave validates candidates 0, 1 and 2, and the second
+        # slave candidates 2 and 4. Only the votes for 2 are kept.
+        vo.validate_and_gather_votes()
+        self.assertEqual([c.obj for c in vo.candidates], [2])
+        self.assertEqual(len(vo.votes), 4)
+        for vote in vo.votes:
+            self.assertEqual([e[0].obj for e in vote], [2])
+
+        # The results match validating and voting separately.
+        vo.gather_candidates()
+        vo.validate_candidates()
+        self.assertEqual([c.obj for c in vo.candidates], [2])
+        vo.gather_votes()
+        self.assertEqual(len(vo.votes), 4)
+
+        # Candidates can be cleared from within a coroutine.
+        run(vo.clear_candidates(clear_env=True, as_coro=True))
+        self.assertEqual(vo.candidates, [])
+        vo.gather_candidates()
+        self.assertEqual(vo.candidates, [])
+
+        # Random voting validates the candidates but gathers no votes, and
+        # keeps the previously gathered votes.
+        self.assertEqual(vo.gather_and_vote(vote_random), [])
+        votes = vo.votes
+        run(self.menv.trigger_all())
+        winners = vo.gather_and_vote(vote_random, validate=True, winners=2)
+        self.assertEqual([w[0].obj for w in winners], [2])
+        self.assertIs(vo.votes, votes)